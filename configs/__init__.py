@@ -1,6 +1,6 @@
 import datetime
 import os
-from typing import Final
+from typing import Final, Literal
 
 from pydantic import BaseSettings, PostgresDsn
 
@@ -19,6 +19,7 @@ class BaseConfigs(BaseSettings):
     SECRET_KEY: str
     JWT_ALGORITHM: Final[str] = "HS256"
     JWT_ACCESS_TOKEN_EXPIRES: datetime.timedelta = datetime.timedelta(minutes=30)
+    JWT_BLOCKLIST_SYNC_INTERVAL: float = 30.0
 
     REDIS_HOSTNAME: str
     REDIS_PORT: int
@@ -26,6 +27,46 @@ class BaseConfigs(BaseSettings):
 
     CACHE_TYPE: str = "RedisCache"
     CACHE_DEFAULT_TIMEOUT: int
+    CACHE_STALE_TIMEOUT: int = 60
+    CACHE_LOCK_TIMEOUT: int = 10
+    CACHE_LOCK_WAIT: float = 2.0
+    CACHE_XFETCH_BETA: float = 1.0
+    CACHE_COMPRESSION_THRESHOLD: int = 1024
+    CACHE_COMPRESSION_LARGE: int = 262144
+    CACHE_WARM_WORKERS: int = 2
+
+    HTTP_CACHE_MAX_AGE: int = 5
+
+    METRICS_INTERVAL: float = 10.0
+    METRICS_TOKEN: str | None = None
+    SLOW_QUERY_THRESHOLD: float = 0.1
+    N_PLUS_ONE_THRESHOLD: int = 5
+    SERVER_TIMING: bool = True
+
+    LOG_QUEUE_SIZE: int = 10000
+    ACCESS_LOG_SAMPLE_RATE: float = 0.1
+    ACCESS_LOG_SLOW_THRESHOLD: float = 1.0
+    LOG_QUEUE_POLICY: Literal["drop", "block"] = "drop"
+
+    LOCAL_CACHE_SIZE: int = 1024
+    LOCAL_CACHE_TIMEOUT: float = 5.0
+
+    USER_IDENTITY_TIMEOUT: int = 300
+
+    POSTS_PAGE_SIZE: int = 25
+    POSTS_MAX_PAGE_SIZE: int = 100
+
+    COMMENTS_PAGE_SIZE: int = 20
+    COMMENTS_MAX_PAGE_SIZE: int = 100
+
+    COMMENT_TREE_DEPTH: int = 5
+    COMMENT_TREE_MAX_DEPTH: int = 20
+    COMMENT_TREE_CHILDREN: int = 20
+    COMMENT_TREE_MAX_CHILDREN: int = 100
+
+    VOTE_FLUSH_INTERVAL: int = 5
+    VOTE_FLUSH_LOCK_TIMEOUT: int = 60
+    VOTE_BITMAP_TIMEOUT: int = 604800
 
     TESTING: bool = False
 
@@ -63,6 +104,7 @@ class ProdConfig(BaseConfigs):
 
     DEBUG: Final[bool] = False
     TESTING: Final[bool] = False
+    SERVER_TIMING: Final[bool] = False
 
     class Config:
         """Environment Configurations"""
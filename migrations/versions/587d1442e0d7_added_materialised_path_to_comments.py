@@ -0,0 +1,45 @@
+"""Added a materialised ancestry path to comments
+
+Revision ID: 587d1442e0d7
+Revises: d4369d77cffd
+Create Date: 2026-10-18 14:52:30.118364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '587d1442e0d7'
+down_revision = 'd4369d77cffd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('path', sa.String(), nullable=True))
+
+    op.execute(
+        """
+        WITH RECURSIVE tree AS (
+            SELECT id, id::text || '/' AS path
+            FROM comments
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT comments.id, tree.path || comments.id::text || '/'
+            FROM comments
+            JOIN tree ON comments.parent_id = tree.id
+        )
+        UPDATE comments SET path = tree.path FROM tree WHERE comments.id = tree.id
+        """
+    )
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_path', ['path'], unique=False, postgresql_ops={'path': 'text_pattern_ops'})
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_path')
+        batch_op.drop_column('path')
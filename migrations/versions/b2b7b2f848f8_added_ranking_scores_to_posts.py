@@ -0,0 +1,55 @@
+"""Added vote tallies and precomputed ranking scores to posts
+
+Revision ID: b2b7b2f848f8
+Revises: f8e653277daf
+Create Date: 2026-10-18 10:41:07.281954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2b7b2f848f8'
+down_revision = 'f8e653277daf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('upvotes', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('downvotes', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('hot_score', sa.Float(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('controversy_score', sa.Float(), nullable=False, server_default='0'))
+
+    # Individual votes were never recorded, so tallies are derived from the net count
+    op.execute(
+        """
+        UPDATE post
+        SET upvotes = GREATEST(votes - 1, 0),
+            downvotes = GREATEST(1 - votes, 0),
+            hot_score = SIGN(votes) * LOG(GREATEST(ABS(votes), 1)::float)
+                + (EXTRACT(EPOCH FROM created_on) - 1134028003) / 45000
+        """
+    )
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_hot_score_id', ['hot_score', 'id'], unique=False)
+        batch_op.create_index('ix_post_belongs_to_hot_score', ['belongs_to', 'hot_score', 'id'], unique=False)
+        batch_op.create_index('ix_post_belongs_to_votes', ['belongs_to', 'votes', 'id'], unique=False)
+        batch_op.create_index('ix_post_belongs_to_created_on', ['belongs_to', 'created_on', 'id'], unique=False)
+        batch_op.create_index('ix_post_belongs_to_controversy_score', ['belongs_to', 'controversy_score', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_belongs_to_controversy_score')
+        batch_op.drop_index('ix_post_belongs_to_created_on')
+        batch_op.drop_index('ix_post_belongs_to_votes')
+        batch_op.drop_index('ix_post_belongs_to_hot_score')
+        batch_op.drop_index('ix_post_hot_score_id')
+        batch_op.drop_column('controversy_score')
+        batch_op.drop_column('hot_score')
+        batch_op.drop_column('downvotes')
+        batch_op.drop_column('upvotes')
@@ -1,26 +1,32 @@
 import os
 
-from flask import Flask, Response, request
+from flask import Flask, Response
 
 from tafakari.configs import configs
 
 from .commands import (
+    cache_stats,
     create_db,
     create_tables,
     drop_db,
     drop_tables,
+    flush_votes,
     recreate_db,
     seed,
     seed_users,
+    warm_cache,
 )
 from .controllers.authentication import authentications
 from .controllers.comments import comments
+from .controllers.metrics import metrics
 from .controllers.posts import posts
 from .controllers.subreddits import subreddits
 from .controllers.users import user
 from .database import SQLALCHEMY_DATABASE_URI, db
 from .extensions import bcrypt, cache, cors, jwt, limiter, migrations
-from .utils import configure_logger, get_client_ip_address
+from .instrumentation import init_instrumentation
+from .pubsub import start_listener
+from .utils import configure_logger
 
 
 def create_app(
@@ -56,6 +62,11 @@ def create_app(
     register_extensions(app=app)
     register_commands(app=app)
     register_blueprints(app=app)
+    init_instrumentation(app=app)
+
+    if not app.testing:
+        # Keeps this worker's local cache coherent with the other workers' writes
+        start_listener()
 
     @app.route("/", methods=["GET"])
     @limiter.exempt
@@ -67,16 +78,6 @@ def create_app(
     def ping():
         return "PONG! \nWelcome to tafakari", 200
 
-    @app.before_request
-    def extract_ip_address() -> None:
-        ip_address = get_client_ip_address(request)
-        app.logger.info(
-            "Request received from %s: Method: %s, for URL: %s",
-            f"{ip_address}",
-            request.method,
-            request.url,
-        )
-
     @app.after_request
     def set_headers(response: Response) -> Response:
         """Sets Headers on each response
@@ -88,8 +89,11 @@ def create_app(
             Response: The Response with headers set
         """
         response.headers["Access-Control-Allowed-Methods"] = "GET, POST, DELETE, PUT"
-        response.headers["Content-Type"] = "application/json"
-        response.headers["Cache-Control"] = "no-cache"
+        # Responses that chose their own type, like the metrics export, keep it
+        if response.mimetype == app.response_class.default_mimetype:
+            response.headers["Content-Type"] = "application/json"
+        # Read endpoints set their own policy with cache_control
+        response.headers.setdefault("Cache-Control", "no-cache")
         return response
 
     return app
@@ -135,6 +139,9 @@ def register_commands(app: Flask) -> None:
         drop_tables,
         seed_users,
         seed,
+        warm_cache,
+        flush_votes,
+        cache_stats,
     ]:
         app.cli.command()(command)
 
@@ -150,3 +157,4 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(blueprint=posts)
     app.register_blueprint(blueprint=authentications)
     app.register_blueprint(blueprint=comments)
+    app.register_blueprint(blueprint=metrics)
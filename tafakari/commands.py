@@ -1,3 +1,7 @@
+import functools
+import time
+from collections import defaultdict
+
 import click
 from faker import Faker
 from flask_sqlalchemy import SQLAlchemy
@@ -7,8 +11,20 @@ from sqlalchemy_utils import create_database, database_exists, drop_database
 
 from tafakari.configs import configs
 
+from .controllers.posts import (
+    listing_warmers,
+    warm_post,
+    warm_posts_page,
+    warm_subreddit_feed,
+)
+from .controllers.subreddits import warm_all_subreddits, warm_subreddit
 from .database import SQLALCHEMY_DATABASE_URI, db
+from .models.posts import FEED_SORTS, Post
+from .models.subreddit import Subreddit
 from .models.users import User
+from .utils import get_cache_stats
+from .votes import flush_buffered_votes
+from .warming import schedule_warming, warm_concurrently
 
 
 def database_engine(uri: str) -> MockConnection:
@@ -74,6 +90,69 @@ def seed(num_users: int) -> list:
         return users
 
 
+@click.option("--subreddits", default=10, help="number of largest subreddits to warm")
+@click.option("--posts", default=50, help="number of hottest posts to warm")
+@click.option("--concurrency", default=4, help="entries built at once")
+def warm_cache(subreddits: int, posts: int, concurrency: int) -> None:
+    """Precomputes the most requested cache entries after a deploy or a Redis flush
+
+    Warms the subreddits listing, the first page of posts, the largest subreddits and
+    each of their feeds, and the hottest posts.
+
+    Args:
+        subreddits (int): Number of largest subreddits to warm. Defaults to 10
+        posts (int): Number of hottest posts to warm. Defaults to 50
+        concurrency (int): Entries built at once. Defaults to 4
+    """
+    subreddit_ids = Subreddit.largest_ids(subreddits)
+    warmers = [
+        ("ALL_SUBREDDITS", warm_all_subreddits),
+        ("ALL_POSTS", warm_posts_page),
+        *[
+            ("SUBREDDIT_ID", functools.partial(warm_subreddit, subreddit_id))
+            for subreddit_id in subreddit_ids
+        ],
+        *[
+            (
+                "ALL_POSTS_IN_SUBREDDIT",
+                functools.partial(warm_subreddit_feed, subreddit_id, sort),
+            )
+            for subreddit_id in subreddit_ids
+            for sort in FEED_SORTS
+        ],
+        *[
+            ("POST_ID", functools.partial(warm_post, post_id))
+            for post_id in Post.hottest_ids(posts)
+        ],
+    ]
+
+    timings: dict[str, list[float]] = defaultdict(list)
+    failures: dict[str, int] = defaultdict(int)
+    started = time.perf_counter()
+
+    for done, (family, seconds, succeeded) in enumerate(
+        warm_concurrently(warmers, concurrency), start=1
+    ):
+        timings[family].append(seconds)
+        if not succeeded:
+            failures[family] += 1
+
+        click.echo(
+            f"[{done}/{len(warmers)}] {family} in {seconds * 1000:.0f} ms"
+            + ("" if succeeded else " (failed)")
+        )
+
+    click.echo(
+        f"{'family':<24}{'keys':>6}{'failed':>8}{'total s':>10}{'slowest ms':>12}"
+    )
+    for family, family_timings in timings.items():
+        click.echo(
+            f"{family:<24}{len(family_timings):>6}{failures[family]:>8}"
+            f"{sum(family_timings):>10.2f}{max(family_timings) * 1000:>12.0f}"
+        )
+    click.echo(f"Warmed {len(warmers)} keys in {time.perf_counter() - started:.2f}s")
+
+
 @click.option("--num_users", default=3, help="number of users")
 def seed_users(num_users: int) -> None:
     """Seeds a number of users specified by the num_users argument
@@ -116,3 +195,56 @@ def drop_db() -> None:
     engine = database_engine(uri=SQLALCHEMY_DATABASE_URI)
     if database_exists(engine.url):
         drop_database(engine.url)
+
+
+@click.option(
+    "--interval",
+    default=configs.VOTE_FLUSH_INTERVAL,
+    help="seconds between flushes, 0 flushes once and exits",
+)
+def flush_votes(interval: int) -> None:
+    """Applies votes buffered in Redis to the database
+
+    Feeds whose rankings the votes may have changed are rebuilt straight away.
+
+    Args:
+        interval (int): Seconds between flushes. Defaults to configs.VOTE_FLUSH_INTERVAL
+    """
+    while True:
+        flushed = flush_buffered_votes(
+            on_feeds_retired=lambda subreddit_ids: schedule_warming(
+                *listing_warmers(subreddit_ids), wait=True
+            )
+        )
+        click.echo(
+            f"Flushed votes for {flushed['posts']} posts "
+            f"and {flushed['comments']} comments"
+        )
+
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+def cache_stats() -> None:
+    """Reports hit ratios, Redis latencies and compression savings per cache key family"""
+    stats = get_cache_stats()
+
+    if not stats:
+        click.echo("No cache reads or writes recorded yet")
+        return
+
+    click.echo(
+        f"{'family':<24}{'hit ratio':>11}{'get ms':>9}{'writes':>8}{'set ms':>9}"
+        f"{'avg KB':>9}{'compressed':>12}{'avg ratio':>11}{'KB saved':>11}"
+    )
+    for family, family_stats in sorted(stats.items()):
+        click.echo(
+            f"{family:<24}{family_stats['hit_ratio']:>11.2f}"
+            f"{family_stats['avg_get_ms']:>9.2f}{family_stats['writes']:>8}"
+            f"{family_stats['avg_set_ms']:>9.2f}"
+            f"{family_stats['avg_stored_bytes'] / 1024:>9.1f}"
+            f"{family_stats.get('compressed', 0):>12}"
+            f"{family_stats['ratio']:>11.2f}"
+            f"{family_stats['bytes_saved'] / 1024:>11.1f}"
+        )
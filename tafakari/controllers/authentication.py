@@ -1,5 +1,6 @@
+import time
 from http import HTTPStatus
-from typing import Any, Optional
+from typing import Any, Final, Optional
 
 import pendulum
 import redis
@@ -10,10 +11,11 @@ from sqlalchemy import and_, exc
 
 from tafakari.configs import configs
 
-from ..extensions import jwt, limiter
+from ..extensions import jwt, limiter, revoked_tokens
 from ..models.users import User, check_password
+from ..pubsub import publish, subscribe
 from ..utils import get_client_ip_address, get_logger_instance
-from .schemas import UserRequestSchema, UserViewSchema
+from .schemas import UserRequestSchema, UserSnapshotSchema, UserViewSchema
 
 authentications = Blueprint("authentication", __name__, url_prefix="/auth")
 
@@ -21,6 +23,15 @@ jwt_redis_blocklist = redis.StrictRedis(
     host=configs.REDIS_HOSTNAME, port=configs.REDIS_PORT, db=0, decode_responses=True
 )
 
+# Sorted set of the revoked token ids, scored by when their blocklist entries expire
+JWT_REVOKED_TOKENS: Final[str] = "jwt_revoked_tokens"
+
+# Redis key holding the Unix time tokens were first recorded in JWT_REVOKED_TOKENS
+JWT_REVOKED_TOKENS_SINCE: Final[str] = "jwt_revoked_tokens:since"
+
+# Pub/sub channel telling every worker which token was just revoked
+JWT_REVOCATIONS_CHANNEL: Final[str] = "jwt_revocations"
+
 
 @jwt.user_identity_loader
 def user_identity_lookup(user) -> User:
@@ -28,18 +39,56 @@ def user_identity_lookup(user) -> User:
 
 
 @jwt.user_lookup_loader
-def user_lookup_callback(_jwt_header, jwt_data) -> Optional[User]:
+def user_lookup_callback(_jwt_header, jwt_data) -> Optional[UserSnapshotSchema]:
     identity = jwt_data["sub"]
-    return User.query.filter_by(username=identity).one_or_none()
+    return User.get_snapshot(identity)
 
 
 @jwt.token_in_blocklist_loader
 def check_if_token_is_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
     jti = jwt_payload["jti"]
+
+    if revoked_tokens.is_stale():
+        sync_revoked_tokens()
+
+    # Most tokens were never revoked and are cleared without a round trip
+    if jti not in revoked_tokens and revoked_tokens.is_complete():
+        return False
+
     token_in_redis = jwt_redis_blocklist.get(jti)
     return token_in_redis is not None
 
 
+def sync_revoked_tokens() -> None:
+    """Syncs this worker's revoked token ids with the tokens revoked by every worker
+
+    Tokens revoked before JWT_REVOKED_TOKENS was kept are only in the blocklist, so
+    the set is incomplete until the last of them has expired.
+    """
+    now = time.time()
+
+    pipeline = jwt_redis_blocklist.pipeline()
+    pipeline.setnx(JWT_REVOKED_TOKENS_SINCE, now)
+    pipeline.get(JWT_REVOKED_TOKENS_SINCE)
+    pipeline.zrangebyscore(JWT_REVOKED_TOKENS, now, "+inf", withscores=True)
+    _, since, revoked = pipeline.execute()
+
+    revoked_tokens.sync(
+        dict(revoked),
+        complete_at=float(since) + configs.JWT_ACCESS_TOKEN_EXPIRES.total_seconds(),
+    )
+
+
+@subscribe(JWT_REVOCATIONS_CHANNEL, on_reset=revoked_tokens.mark_stale)
+def add_revoked_token(revocation: dict) -> None:
+    """Adds a token revoked by any worker to this worker's revoked token ids
+
+    Args:
+        revocation (dict): The token's id and the Unix time its revocation expires at
+    """
+    revoked_tokens.add(revocation["jti"], revocation["expires_at"])
+
+
 @jwt.additional_claims_loader
 def add_additional_claims(identity: Any):
     return dict(exp=pendulum.now() + configs.JWT_ACCESS_TOKEN_EXPIRES)
@@ -122,7 +171,17 @@ def logout() -> tuple[Response, int]:
     logger = get_logger_instance(current_app)
 
     jti = get_jwt()["jti"]
-    jwt_redis_blocklist.set(jti, "", ex=configs.JWT_ACCESS_TOKEN_EXPIRES)
+    now = time.time()
+    expires_at = now + configs.JWT_ACCESS_TOKEN_EXPIRES.total_seconds()
+
+    pipeline = jwt_redis_blocklist.pipeline()
+    pipeline.set(jti, "", ex=configs.JWT_ACCESS_TOKEN_EXPIRES)
+    pipeline.zadd(JWT_REVOKED_TOKENS, {jti: expires_at})
+    pipeline.zremrangebyscore(JWT_REVOKED_TOKENS, "-inf", now)
+    pipeline.execute()
+
+    revoked_tokens.add(jti, expires_at)
+    publish(JWT_REVOCATIONS_CHANNEL, {"jti": jti, "expires_at": expires_at})
     logger.info("User %s Successfully Signed-Out", current_user.username)
     return jsonify(message="Access token revoked"), HTTPStatus.OK
 
@@ -6,10 +6,20 @@ from flask_jwt_extended import current_user, jwt_required
 from flask_pydantic import validate
 from sqlalchemy import and_
 
-from ..extensions import cache, limiter
+from ..extensions import limiter
 from ..models.comments import Comments
 from ..models.posts import Post
-from .schemas import CommentRequestSchema, CommentViewSchema, UserViewSchema
+from ..utils import CACHE_TAGS, invalidate_memoized, invalidate_tags
+from ..votes import cast_vote, overlay_pending_votes
+from .schemas import (
+    CommentContextQuerySchema,
+    CommentContextViewSchema,
+    CommentRequestSchema,
+    CommentsPageQuerySchema,
+    CommentTreeQuerySchema,
+    CommentViewSchema,
+    UserViewSchema,
+)
 
 comments = Blueprint("comments", __name__)
 
@@ -35,8 +45,10 @@ def add_comment(body: CommentRequestSchema, post_id: int) -> tuple[Response, int
             comment=body.comment, user_id=current_user.id, post_id=post_id
         )
 
-        cache.delete(f"post_{post_id}")
-        cache.delete(f"{current_user.username}_profile")
+        invalidate_tags(
+            CACHE_TAGS["POST_COMMENTS"](post_id),
+            CACHE_TAGS["USER"](current_user.username),
+        )
         return (
             jsonify(
                 message=comment.comment,
@@ -49,6 +61,114 @@ def add_comment(body: CommentRequestSchema, post_id: int) -> tuple[Response, int
     return jsonify(message="No such post exists"), HTTPStatus.NOT_FOUND
 
 
+@comments.route("/posts/<int:post_id>/comments", methods=["GET"])
+@limiter.limit("1000/day")
+@validate(query=CommentsPageQuerySchema)
+def get_comments_page(
+    post_id: int, query: CommentsPageQuerySchema
+) -> tuple[Response, int]:
+    """Gets a page of a Post's top-level comments, or of a comment's replies
+
+    Pass a comment's replies_cursor to page through its replies, or a page's
+    next_cursor to continue where that page ended.
+
+    Args:
+        post_id (int): The Post Id parsed from URL
+        query (CommentsPageQuerySchema): Sort order, page size and cursor
+
+    Returns:
+        tuple[Response, int]: The Response Object and Status Code
+    """
+    parent_id, sort, after = None, query.sort, None
+
+    if query.cursor:
+        try:
+            parent_id, sort, after = Comments.decode_page_cursor(query.cursor)
+        except (ValueError, TypeError):
+            return jsonify(message="Invalid cursor"), HTTPStatus.BAD_REQUEST
+
+    if Post.get_by_id(post_id):
+        page = Comments.get_comments_page(
+            post_id, parent_id=parent_id, sort=sort, limit=query.limit, after=after
+        ).dict(exclude_none=True)
+
+        return jsonify(overlay_pending_votes(page, kind=None)), HTTPStatus.OK
+
+    return jsonify(message="No such post exists"), HTTPStatus.NOT_FOUND
+
+
+@comments.route("/posts/<int:post_id>/comments/tree", methods=["GET"])
+@limiter.limit("1000/day")
+@validate(query=CommentTreeQuerySchema)
+def get_comment_tree(
+    post_id: int, query: CommentTreeQuerySchema
+) -> tuple[Response, int]:
+    """Gets the threaded comments of a Post
+
+    Args:
+        post_id (int): The Post Id parsed from URL
+        query (CommentTreeQuerySchema): Depth and replies-per-comment limits of the thread
+
+    Returns:
+        tuple[Response, int]: The Response Object and Status Code
+    """
+    post = Post.get_by_id(post_id)
+
+    if post:
+        thread = Comments.get_comment_tree(
+            post_id, max_depth=query.max_depth, top_n_children=query.top_n_children
+        ).dict()
+
+        return jsonify(overlay_pending_votes(thread, kind=None)), HTTPStatus.OK
+
+    return jsonify(message="No such post exists"), HTTPStatus.NOT_FOUND
+
+
+@comments.route("/posts/<int:post_id>/comments/<int:comment_id>", methods=["GET"])
+@limiter.limit("1000/day")
+@validate(query=CommentContextQuerySchema)
+def get_comment_permalink(
+    post_id: int, comment_id: int, query: CommentContextQuerySchema
+) -> tuple[Response, int]:
+    """Gets a comment with its parent comments for context and its nested replies
+
+    Args:
+        post_id (int): The Post Id parsed from URL
+        comment_id (int): The Comment Id parsed from URL
+        query (CommentContextQuerySchema): Levels of context and of replies to load
+
+    Returns:
+        tuple[Response, int]: The Response Object and Status Code
+    """
+    comment: Comments = Comments.query.filter(
+        and_(Comments.id == comment_id, Comments.post_id == post_id)
+    ).first()
+
+    if comment:
+        response = CommentContextViewSchema(
+            ancestors=[
+                CommentViewSchema(
+                    comment=ancestor.comment,
+                    id=ancestor.id,
+                    votes=ancestor.votes,
+                    created_on=ancestor.created_on,
+                    user=UserViewSchema.from_orm(ancestor.user),
+                    post_id=ancestor.post_id,
+                    parent_id=ancestor.parent_id,
+                )
+                for ancestor in comment.get_ancestors(levels=query.context)
+            ],
+            comment=comment.get_subtree(max_depth=query.max_depth),
+        ).dict(exclude_none=True)
+
+        return jsonify(overlay_pending_votes(response, kind=None)), HTTPStatus.OK
+
+    return (
+        jsonify(message="The comment you selected does not exist"),
+        HTTPStatus.NOT_FOUND,
+    )
+
+
 @comments.route("/posts/<int:post_id>/comments/<int:comment_id>", methods=["PUT"])
 @limiter.limit("5/hour")
 @validate(body=CommentRequestSchema)
@@ -94,9 +214,15 @@ def update_comment(
                 else updated_comment.parent_id,
             ).dict()
 
-            cache.delete(f"post_{post_id}")
-            cache.delete(f"{current_user.username}_profile")
-            cache.delete("all_posts")
+            invalidate_tags(
+                CACHE_TAGS["POST_COMMENTS"](post_id),
+                CACHE_TAGS["USER"](current_user.username),
+            )
+            invalidate_memoized(
+                "COMMENT_PARENT", *[child.id for child in updated_comment.children]
+            )
+            if updated_comment.parent_id:
+                invalidate_memoized("COMMENT_REPLIES", updated_comment.parent_id)
             return jsonify(response), HTTPStatus.ACCEPTED
 
         return (
@@ -148,7 +274,11 @@ def reply_to_a_comment(
                 parent_id=reply.parent_id,
             ).dict()
 
-            # TODO: Implement cache invalidations
+            invalidate_tags(
+                CACHE_TAGS["POST_COMMENTS"](post_id),
+                CACHE_TAGS["USER"](current_user.username),
+            )
+            invalidate_memoized("COMMENT_REPLIES", comment.id)
             return jsonify(response), HTTPStatus.OK
 
         return (
@@ -180,10 +310,19 @@ def delete_a_comment(post_id: int, comment_id: int) -> tuple[Response, int]:
         ).first()
 
         if comment:
+            parent_id = comment.parent_id
+            child_ids = [child.id for child in comment.children]
             comment.delete()
 
-            cache.delete(f"post_{post_id}")
-            cache.delete(f"{current_user.username}_profile")
+            invalidate_tags(
+                CACHE_TAGS["POST_COMMENTS"](post_id),
+                CACHE_TAGS["USER"](current_user.username),
+            )
+            # Orphaned replies lose their parent along with the deleted comment
+            invalidate_memoized("COMMENT_PARENT", *child_ids)
+            invalidate_memoized("COMMENT_REPLIES", comment_id)
+            if parent_id:
+                invalidate_memoized("COMMENT_REPLIES", parent_id)
             return jsonify(message="Comment deleted successfully"), HTTPStatus.OK
 
         return (
@@ -217,13 +356,13 @@ def upvote_a_post_comment(post_id: int, comment_id: int) -> tuple[Response, int]
         ).first()
 
         if comment:
-            comment.update(votes=comment.votes + 1)
-
-            comment.save()
+            if cast_vote("comment", comment.id, current_user.id, 1):
+                return jsonify(message="Up-voted Successfully"), HTTPStatus.ACCEPTED
 
-            cache.delete(f"post_{post_id}")
-            cache.delete(f"{current_user.username}_profile")
-            return jsonify(message="Up-voted Successfully"), HTTPStatus.ACCEPTED
+            return (
+                jsonify(message="You have already up-voted this comment"),
+                HTTPStatus.CONFLICT,
+            )
 
         return (
             jsonify(message="The comment you selected does not exist"),
@@ -256,13 +395,13 @@ def downvote_a_post_comment(post_id: int, comment_id: int) -> tuple[Response, in
         ).first()
 
         if comment and current_user:
-            comment.update(votes=comment.votes - 1)
-
-            comment.save()
+            if cast_vote("comment", comment.id, current_user.id, -1):
+                return jsonify(message="Down-voted Successfully"), HTTPStatus.ACCEPTED
 
-            cache.delete(f"post_{post_id}")
-            cache.delete(f"{current_user.username}_profile")
-            return jsonify(message="Down-voted Successfully"), HTTPStatus.ACCEPTED
+            return (
+                jsonify(message="You have already down-voted this comment"),
+                HTTPStatus.CONFLICT,
+            )
 
         return (
             jsonify(message="The comment you selected does not exist"),
@@ -0,0 +1,64 @@
+import hmac
+from http import HTTPStatus
+
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import current_user, jwt_required
+
+from ...configs import configs
+from ..extensions import limiter, local_cache
+from ..instrumentation import render_metrics
+from ..utils import get_cache_stats
+
+metrics = Blueprint("metrics", __name__)
+
+
+@metrics.route("/metrics", methods=["GET"])
+@limiter.exempt
+def get_request_metrics() -> tuple[Response, int]:
+    """Export request latency, status code, SQL and Redis metrics for Prometheus
+
+    Series are summed over every worker and labelled by blueprint, route and method.
+    Scrapers authenticate with METRICS_TOKEN as a bearer token; without one set, the
+    endpoint is closed.
+
+    Returns:
+        tuple[Response, int]: Response Object and Status Code
+    """
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+
+    if not configs.METRICS_TOKEN or not hmac.compare_digest(
+        token.encode(), configs.METRICS_TOKEN.encode()
+    ):
+        return (
+            jsonify(message="You are not allowed to access this resource"),
+            HTTPStatus.FORBIDDEN,
+        )
+
+    return (
+        Response(render_metrics(), mimetype="text/plain; version=0.0.4"),
+        HTTPStatus.OK,
+    )
+
+
+@metrics.route("/metrics/cache", methods=["GET"])
+@limiter.exempt
+@jwt_required()
+def get_cache_metrics() -> tuple[Response, int]:
+    """Get the cache's hit ratio, Redis latency and entry sizes per key family
+
+    Families are those of CACHE_KEYS_REFERENCE, summed over every worker. The local
+    cache figures are of the worker serving the request.
+
+    Returns:
+        tuple[Response, int]: Response Object and Status Code
+    """
+    if not current_user.is_admin:
+        return (
+            jsonify(message="You are not allowed to access this resource"),
+            HTTPStatus.FORBIDDEN,
+        )
+
+    return (
+        jsonify(families=get_cache_stats(), local_cache=local_cache.stats()),
+        HTTPStatus.OK,
+    )
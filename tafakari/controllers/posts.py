@@ -1,21 +1,52 @@
+import functools
+import json
 from http import HTTPStatus
+from typing import Callable, Iterable
 
 import pendulum
 from flask import Blueprint, Response, jsonify
 from flask_jwt_extended import current_user, jwt_required
 from flask_pydantic import validate
-from sqlalchemy import and_
+from sqlalchemy import and_, tuple_
+from sqlalchemy.orm import joinedload
 
 from tafakari.configs import configs
 
-from ..extensions import cache, limiter
-from ..models.posts import Post
+from ..extensions import limiter
+from ..models.comments import Comments
+from ..models.posts import FEED_SORTS, Post
 from ..models.subreddit import Subreddit
 from ..models.users import User
-from ..utils import CACHE_KEYS_REFERENCE, cache_invalidator, cache_setter
+from ..utils import (
+    CACHE_GENERATIONS,
+    CACHE_KEYS_REFERENCE,
+    CACHE_TAGS,
+    bump_generation,
+    cache_getter,
+    cache_setter,
+    current_generations,
+    decode_cursor,
+    encode_cursor,
+    generational_key,
+    get_or_recompute,
+    invalidate_tags,
+    refresh_entry,
+    set_recomputed,
+)
+from ..responses import (
+    CACHE_CONTROL_POLICIES,
+    cache_control,
+    cacheable_response,
+    cached_response,
+)
+from ..votes import cast_vote
+from ..warming import schedule_warming
 from .schemas import (
     AllPostsViewSchema,
     CreatePostRequestSchema,
+    FeedQuerySchema,
+    PaginationQuerySchema,
+    PostQuerySchema,
     PostViewSchema,
     UserViewSchema,
 )
@@ -46,7 +77,7 @@ def create_subreddit_post(body: CreatePostRequestSchema) -> tuple[Response, int]
             belongs_to=subreddit.id,
         )
 
-        created_post = PostViewSchema(
+        post_schema = PostViewSchema(
             id=new_post.id,
             subreddit_id=new_post.belongs_to,
             title=new_post.title,
@@ -55,15 +86,34 @@ def create_subreddit_post(body: CreatePostRequestSchema) -> tuple[Response, int]
             created_on=new_post.created_on,
             user=UserViewSchema.from_orm(current_user),
             comments=None,
-        ).dict()
-
-        cache_setter(CACHE_KEYS_REFERENCE["POST_ID"](new_post.id), created_post)
-        cache_invalidator(
-            [
-                CACHE_KEYS_REFERENCE["PROFILE"](current_user.username),
-                CACHE_KEYS_REFERENCE["ALL_POSTS"],
-                CACHE_KEYS_REFERENCE["ALL_POSTS_IN_SUBREDDIT"](subreddit.id),
-            ]
+        )
+        created_post = post_schema.dict()
+
+        # The newest-first feed only gains the post at its head, so it is patched
+        feed_generation = CACHE_GENERATIONS["SUBREDDIT"](subreddit.id)
+        read_under = current_generations(feed_generation)[feed_generation]
+        previous_new_feed = cache_getter(
+            subreddit_feed_key(subreddit.id, "new", generation=read_under)
+        )
+        bumped = bump_generation(CACHE_GENERATIONS["POSTS"], feed_generation)
+        patched = insert_into_new_feed(
+            subreddit.id,
+            post_schema.dict(exclude_none=True),
+            previous_new_feed,
+            read_under=read_under,
+            bumped_to=bumped[feed_generation],
+        )
+        invalidate_tags(CACHE_TAGS["USER"](current_user.username))
+        cache_setter(
+            CACHE_KEYS_REFERENCE["POST_ID"](new_post.id),
+            cacheable_response(created_post),
+            tags=post_cache_tags(new_post.id),
+        )
+        schedule_warming(
+            *listing_warmers(
+                [subreddit.id],
+                sorts=[sort for sort in FEED_SORTS if not (patched and sort == "new")],
+            )
         )
         return (
             jsonify(message=f"Post {new_post.title} created", timestamp=pendulum.now()),
@@ -121,15 +171,14 @@ def update_subreddit_post(
                 votes=updated_post.votes,
                 created_on=updated_post.created_on,
                 user=UserViewSchema.from_orm(current_user),
-                comments=post.get_all_post_comments(),
+                comments=Comments.get_comments_page(post.id),
             ).dict()
 
-            cache_setter(CACHE_KEYS_REFERENCE["POST_ID"](post_id), response)
-            cache_invalidator(
-                [
-                    CACHE_KEYS_REFERENCE["ALL_POSTS"],
-                    CACHE_KEYS_REFERENCE["PROFILE"](current_user.username),
-                ]
+            invalidate_tags(CACHE_TAGS["POST"](post_id))
+            cache_setter(
+                CACHE_KEYS_REFERENCE["POST_ID"](post_id),
+                cacheable_response(response),
+                tags=post_cache_tags(post_id),
             )
             return jsonify(response), HTTPStatus.ACCEPTED
 
@@ -145,154 +194,427 @@ def update_subreddit_post(
 
 
 @posts.route("/posts", methods=["GET"])
+@cache_control(CACHE_CONTROL_POLICIES["PUBLIC"])
 @limiter.limit("1000/day")
-def get_all_posts() -> tuple[Response | str, int]:
-    """Get all posts irregardless of subreddit
+@validate(query=PaginationQuerySchema)
+def get_all_posts(query: PaginationQuerySchema) -> tuple[Response | str, int]:
+    """Get a page of posts irregardless of subreddit, newest first
+
+    Pages are keyset paginated on (created_on, id); pass the returned next_cursor back
+    as the cursor query parameter to fetch the following page.
+
+    Args:
+        query (PaginationQuerySchema): The page size and cursor parsed from the query string
 
     Returns:
         tuple[Response | str, int]: Response Object and Status Code
     """
-    cache_key = CACHE_KEYS_REFERENCE["ALL_POSTS"]
-    cached_data = cache.get(cache_key)
+    after = None
+
+    if query.cursor:
+        try:
+            created_on, post_id = decode_cursor(query.cursor)
+            after = (pendulum.parse(created_on), int(post_id))
+        except (ValueError, TypeError):
+            return jsonify(message="Invalid cursor"), HTTPStatus.BAD_REQUEST
+
+    entry = get_or_recompute(
+        posts_page_key(query.limit, query.cursor),
+        lambda: build_posts_page(query.limit, after),
+        tags=posts_cache_tags,
+    )
+    return cached_response(entry)
 
-    if not cached_data:
-        all_posts = Post.query.all()
 
-        if all_posts:
-            all_posts_response = []
+def build_posts_page(limit: int, after: tuple | None = None) -> dict:
+    """Builds a page of posts irregardless of subreddit, newest first
 
-            for post in all_posts:
-                creator = User.get_by_id(post.created_by)
-                creator_schema = UserViewSchema.from_orm(creator)
+    Args:
+        limit (int): Page size
+        after (tuple | None, optional): (created_on, id) of the previous page's last post. Defaults to None.
 
-                post = PostViewSchema(
-                    subreddit_id=post.belongs_to,
-                    title=post.title,
-                    text=post.text,
-                    id=post.id,
-                    votes=post.votes,
-                    user=creator_schema,
-                    comments=None,
-                    created_on=post.created_on,
-                )
+    Returns:
+        dict: The page as a cacheable_response
+    """
+    page_query = Post.query.options(joinedload(Post.user)).order_by(
+        Post.created_on.desc(), Post.id.desc()
+    )
 
-                all_posts_response.append(post)
+    if after:
+        page_query = page_query.filter(tuple_(Post.created_on, Post.id) < after)
+
+    # Fetch one extra row to learn whether another page follows this one
+    all_posts = page_query.limit(limit + 1).all()
+    has_next_page = len(all_posts) > limit
+    all_posts = all_posts[:limit]
+    all_posts_response = []
+
+    for post in all_posts:
+        creator_schema = UserViewSchema.from_orm(post.user)
+
+        post = PostViewSchema(
+            subreddit_id=post.belongs_to,
+            title=post.title,
+            text=post.text,
+            id=post.id,
+            votes=post.votes,
+            user=creator_schema,
+            comments=None,
+            created_on=post.created_on,
+        )
 
-            response = AllPostsViewSchema(posts=all_posts_response).dict(
-                exclude_none=True
-            )
+        all_posts_response.append(post)
 
-            cache_setter(cache_key, response)
+    if not all_posts:
+        return cacheable_response(
+            {"message": "No Post Found"}, status=HTTPStatus.NOT_FOUND
+        )
 
-            return (
-                jsonify(response),
-                HTTPStatus.OK,
-            )
+    next_cursor = None
+    if has_next_page:
+        last_post = all_posts[-1]
+        next_cursor = encode_cursor(last_post.created_on.isoformat(), last_post.id)
+
+    return cacheable_response(
+        AllPostsViewSchema(posts=all_posts_response, next_cursor=next_cursor).dict(
+            exclude_none=True
+        )
+    )
+
+
+def posts_cache_tags(entry: dict) -> list[str]:
+    """Cache tags of the posts in a cached posts listing
+
+    Args:
+        entry (dict): The listing's cacheable_response
+
+    Returns:
+        list[str]: One tag per listed post
+    """
+    post_ids = entry["vote_refs"].get("post", [])
+    return [CACHE_TAGS["POST"](post_id) for post_id in post_ids]
+
+
+def posts_page_key(
+    limit: int = configs.POSTS_PAGE_SIZE, cursor: str | None = None
+) -> str:
+    """Cache key of a page of posts under the current posts generation
+
+    Args:
+        limit (int, optional): Page size. Defaults to configs.POSTS_PAGE_SIZE.
+        cursor (str | None, optional): Cursor of the page, None for the first. Defaults to None.
+
+    Returns:
+        str: The generational cache key
+    """
+    return generational_key(
+        CACHE_KEYS_REFERENCE["ALL_POSTS"](limit, cursor), CACHE_GENERATIONS["POSTS"]
+    )
+
+
+def subreddit_feed_key(
+    subreddit_id: int,
+    sort: str,
+    limit: int = configs.POSTS_PAGE_SIZE,
+    generation: int | None = None,
+) -> str:
+    """Cache key of a subreddit feed under the subreddit's current generation
+
+    Args:
+        subreddit_id (int): Subreddit Id
+        sort (str): One of FEED_SORTS
+        limit (int, optional): Feed size. Defaults to configs.POSTS_PAGE_SIZE.
+        generation (int | None, optional): Subreddit generation to key under instead
+            of the current one. Defaults to None.
+
+    Returns:
+        str: The generational cache key
+    """
+    subreddit_generation = CACHE_GENERATIONS["SUBREDDIT"](subreddit_id)
+    return generational_key(
+        CACHE_KEYS_REFERENCE["ALL_POSTS_IN_SUBREDDIT"](subreddit_id, sort, limit),
+        subreddit_generation,
+        counters=None if generation is None else {subreddit_generation: generation},
+    )
+
+
+def insert_into_new_feed(
+    subreddit_id: int,
+    post: dict,
+    previous_feed: dict | None,
+    read_under: int,
+    bumped_to: int,
+) -> bool:
+    """Writes a subreddit's newest-first feed through with a just created post
+
+    The feed cached under the previous generation gets the post prepended and is
+    stored under the bumped one, sparing a rebuild from Postgres. That is only safe
+    when this bump directly followed the generation the feed was read under; any
+    other write in between, e.g. another post or a vote flush, may be missing.
+
+    Args:
+        subreddit_id (int): Subreddit Id
+        post (dict): The serialised post, as listed in feeds
+        previous_feed (dict | None): The feed's entry before the generation was bumped
+        read_under (int): Subreddit generation the feed was read under
+        bumped_to (int): Subreddit generation the bump returned
+
+    Returns:
+        bool: Whether the feed was written; False when it must be rebuilt instead
+    """
+    if previous_feed is None or bumped_to != read_under + 1:
+        return False
+
+    listed_posts = json.loads(previous_feed["value"]["body"]).get("posts", [])
+    set_recomputed(
+        subreddit_feed_key(subreddit_id, "new", generation=bumped_to),
+        cacheable_response({"posts": [post, *listed_posts][: configs.POSTS_PAGE_SIZE]}),
+        tags=posts_cache_tags,
+        delta=previous_feed["delta"],
+    )
+    return True
+
+
+def listing_warmers(
+    subreddit_ids: Iterable[int] = (), sorts: Iterable[str] = FEED_SORTS
+) -> list[Callable[[], bool]]:
+    """Warmers rebuilding the first page of posts and the given subreddits' feeds
+
+    Only the default page size is warmed, being what clients ask for unless told
+    otherwise.
+
+    Args:
+        subreddit_ids (Iterable[int], optional): Subreddits whose feeds to warm. Defaults to ().
+        sorts (Iterable[str], optional): Feed sort orders to warm. Defaults to FEED_SORTS.
+
+    Returns:
+        list[Callable[[], bool]]: Warmers for schedule_warming
+    """
+    sorts = list(sorts)
+    return [
+        warm_posts_page,
+        *[
+            functools.partial(warm_subreddit_feed, subreddit_id, sort)
+            for subreddit_id in subreddit_ids
+            for sort in sorts
+        ],
+    ]
+
+
+def warm_posts_page(limit: int = configs.POSTS_PAGE_SIZE) -> bool:
+    """Rebuilds the first page of posts
 
-        return jsonify(message="No Post Found"), HTTPStatus.NOT_FOUND
+    Args:
+        limit (int, optional): Page size. Defaults to configs.POSTS_PAGE_SIZE.
+
+    Returns:
+        bool: Whether it was rebuilt; False when another worker already is
+    """
+    return refresh_entry(
+        posts_page_key(limit),
+        lambda: build_posts_page(limit),
+        tags=posts_cache_tags,
+    )
 
-    return jsonify(cached_data), HTTPStatus.OK
+
+def warm_subreddit_feed(
+    subreddit_id: int, sort: str, limit: int = configs.POSTS_PAGE_SIZE
+) -> bool:
+    """Rebuilds a subreddit feed
+
+    Args:
+        subreddit_id (int): Subreddit Id
+        sort (str): One of FEED_SORTS
+        limit (int, optional): Feed size. Defaults to configs.POSTS_PAGE_SIZE.
+
+    Returns:
+        bool: Whether it was rebuilt; False when another worker already is
+    """
+    return refresh_entry(
+        subreddit_feed_key(subreddit_id, sort, limit),
+        lambda: build_subreddit_feed(subreddit_id, sort, limit),
+        tags=posts_cache_tags,
+    )
 
 
 @posts.route("/subreddits/<int:subreddit_id>/posts", methods=["GET"])
+@cache_control(CACHE_CONTROL_POLICIES["PUBLIC"])
 @limiter.limit("1000/day")
-def get_all_posts_in_subreddit(subreddit_id: int) -> tuple[Response | str, int]:
-    """Get all the posts in a particular subreddit identified by its Id
+@validate(query=FeedQuerySchema)
+def get_all_posts_in_subreddit(
+    subreddit_id: int, query: FeedQuerySchema
+) -> tuple[Response | str, int]:
+    """Get the top posts in a particular subreddit identified by its Id
 
     Args:
         subreddit_id (int): Subreddit Id parsed from URL
+        query (FeedQuerySchema): The feed's sort order (hot, top, new or controversial) and size
 
     Returns:
         tuple[Response | str, int]: Response Object and Status Code
     """
-    # TODO: Fix bug where controller fetches stale data after upvote action
-    cache_key = CACHE_KEYS_REFERENCE["ALL_POSTS_IN_SUBREDDIT"](subreddit_id)
-    cached_data = cache.get(cache_key)
-
-    if not cached_data:
-        subreddit: Subreddit = Subreddit.get_by_id(subreddit_id)
-
-        if subreddit:
-            all_posts = Post.query.filter_by(belongs_to=subreddit_id).all()
-
-            all_posts_response = []
-            if all_posts:
-                for post in all_posts:
-                    post_creator = User.get_by_id(post.created_by)
-                    post_creator_schema = UserViewSchema.from_orm(post_creator)
-
-                    post = PostViewSchema(
-                        id=post.id,
-                        subreddit_id=subreddit.id,
-                        title=post.title,
-                        text=post.text,
-                        votes=post.votes,
-                        user=post_creator_schema,
-                        created_on=post.created_on,
-                        comments=None,
-                    )
-
-                    all_posts_response.append(post)
-
-                response = AllPostsViewSchema(posts=all_posts_response).dict(
-                    exclude_none=True
-                )
-
-                cache_setter(cache_key, response)
-                return (
-                    jsonify(response),
-                    HTTPStatus.OK,
-                )
-
-            return jsonify(message="No Post Found"), HTTPStatus.NOT_FOUND
+    entry = get_or_recompute(
+        subreddit_feed_key(subreddit_id, query.sort, query.limit),
+        lambda: build_subreddit_feed(subreddit_id, query.sort, query.limit),
+        tags=posts_cache_tags,
+    )
 
+    if entry is None:
         return jsonify(message="Subreddit Not Found"), HTTPStatus.NOT_FOUND
 
-    return jsonify(cached_data), HTTPStatus.OK
+    return cached_response(entry)
+
+
+def build_subreddit_feed(subreddit_id: int, sort: str, limit: int) -> dict | None:
+    """Builds a ranked feed of the posts in a subreddit
+
+    Args:
+        subreddit_id (int): Subreddit Id
+        sort (str): One of FEED_SORTS
+        limit (int): Feed size
+
+    Returns:
+        dict | None: The feed as a cacheable_response, None if the subreddit does not exist
+    """
+    subreddit: Subreddit = Subreddit.get_by_id(subreddit_id)
+
+    if not subreddit:
+        return None
+
+    all_posts = (
+        Post.query.options(joinedload(Post.user))
+        .filter_by(belongs_to=subreddit_id)
+        .order_by(*Post.feed_ordering(sort))
+        .limit(limit)
+        .all()
+    )
+
+    all_posts_response = []
+    for post in all_posts:
+        post_creator_schema = UserViewSchema.from_orm(post.user)
+
+        post = PostViewSchema(
+            id=post.id,
+            subreddit_id=subreddit.id,
+            title=post.title,
+            text=post.text,
+            votes=post.votes,
+            user=post_creator_schema,
+            created_on=post.created_on,
+            comments=None,
+        )
+
+        all_posts_response.append(post)
+
+    if not all_posts:
+        return cacheable_response(
+            {"message": "No Post Found"}, status=HTTPStatus.NOT_FOUND
+        )
+
+    return cacheable_response(
+        AllPostsViewSchema(posts=all_posts_response).dict(exclude_none=True)
+    )
 
 
 @posts.route("/posts/<int:post_id>", methods=["GET"])
+@cache_control(CACHE_CONTROL_POLICIES["PUBLIC"])
 @limiter.limit("1000/day")
-def get_post_by_id(post_id: int) -> tuple[Response | str, int]:
-    """Gets posts by specific Id
+@validate(query=PostQuerySchema)
+def get_post_by_id(post_id: int, query: PostQuerySchema) -> tuple[Response | str, int]:
+    """Gets posts by specific Id, with the first page of its top-level comments
 
     Args:
         post_id (int): Post Id parsed from URL
+        query (PostQuerySchema): Sort order of the embedded comments
 
     Returns:
         tuple[Response | str, int]: Response Object and Status Code
     """
-    cache_key = CACHE_KEYS_REFERENCE["POST_ID"](post_id)
-    cached_data = cache.get(cache_key)
+    cache_key = CACHE_KEYS_REFERENCE["POST_ID"](post_id, query.comment_sort)
+    cached_entry = cache_getter(cache_key)
 
-    if not cached_data:
-        post: Post = Post.get_by_id(post_id)
+    if not cached_entry:
+        entry = build_post(post_id, query.comment_sort)
 
-        if post:
-            post_creator = User.get_by_id(post.created_by)
-            subreddit: Subreddit = Subreddit.get_by_id(post.belongs_to)
-            all_post_comments = post.get_all_post_comments()
+        if entry:
+            cache_setter(cache_key, entry, tags=post_cache_tags(post_id))
+            return cached_response(entry)
 
-            if subreddit:
-                post_creator_schema = UserViewSchema.from_orm(post_creator)
+        return jsonify(message="Post Not Found"), HTTPStatus.NOT_FOUND
 
-                post_response = PostViewSchema(
-                    id=post.id,
-                    subreddit_id=subreddit.id,
-                    title=post.title,
-                    text=post.text,
-                    votes=post.votes,
-                    user=post_creator_schema,
-                    comments=all_post_comments,
-                    created_on=post.created_on,
-                ).dict()
+    return cached_response(cached_entry)
 
-                cache_setter(cache_key, post_response)
-                return jsonify(post_response), HTTPStatus.OK
 
-        return jsonify(message="Post Not Found"), HTTPStatus.NOT_FOUND
+def build_post(post_id: int, comment_sort: str = "top") -> dict | None:
+    """Builds the view of a post with the first page of its top-level comments
+
+    Args:
+        post_id (int): Post Id
+        comment_sort (str, optional): Sort order of the embedded comments. Defaults to "top".
+
+    Returns:
+        dict | None: The post as a cacheable_response, None if it does not exist
+    """
+    post: Post = Post.get_by_id(post_id)
+
+    if not post:
+        return None
+
+    post_creator = User.get_by_id(post.created_by)
+    subreddit: Subreddit = Subreddit.get_by_id(post.belongs_to)
+
+    if not subreddit:
+        return None
+
+    all_post_comments = Comments.get_comments_page(post.id, sort=comment_sort)
+    post_creator_schema = UserViewSchema.from_orm(post_creator)
+
+    post_response = PostViewSchema(
+        id=post.id,
+        subreddit_id=subreddit.id,
+        title=post.title,
+        text=post.text,
+        votes=post.votes,
+        user=post_creator_schema,
+        comments=all_post_comments,
+        created_on=post.created_on,
+    ).dict()
+
+    return cacheable_response(post_response)
+
+
+def post_cache_tags(post_id: int) -> list[str]:
+    """Cache tags of a cached post view
 
-    return jsonify(cached_data), HTTPStatus.OK
+    Args:
+        post_id (int): Post Id
+
+    Returns:
+        list[str]: The post's tag and the tag of its comments
+    """
+    return [CACHE_TAGS["POST"](post_id), CACHE_TAGS["POST_COMMENTS"](post_id)]
+
+
+def warm_post(post_id: int, comment_sort: str = "top") -> bool:
+    """Caches the view of a post ahead of its first request
+
+    Args:
+        post_id (int): Post Id
+        comment_sort (str, optional): Sort order of the embedded comments. Defaults to "top".
+
+    Returns:
+        bool: Whether it was cached; False if the post does not exist
+    """
+    entry = build_post(post_id, comment_sort)
+
+    if entry:
+        cache_setter(
+            CACHE_KEYS_REFERENCE["POST_ID"](post_id, comment_sort),
+            entry,
+            tags=post_cache_tags(post_id),
+        )
+
+    return entry is not None
 
 
 @posts.route("/posts/<int:post_id>/upvote", methods=["GET"])
@@ -307,21 +629,16 @@ def upvote_a_post(post_id: int) -> tuple[Response, int]:
     Returns:
         tuple[Response, int]: Response Object and Status Code
     """
-    # TODO: Make up-votes unique per user
     post: Post = Post.get_by_id(post_id)
 
     if post and current_user:
-        post.update(votes=post.votes + 1)
-
-        cache.delete(CACHE_KEYS_REFERENCE["POST_ID"](post.id))
-        cache_invalidator(
-            [
-                CACHE_KEYS_REFERENCE["ALL_POSTS"],
-                CACHE_KEYS_REFERENCE["PROFILE"](current_user.username),
-                CACHE_KEYS_REFERENCE["ALL_POSTS_IN_SUBREDDIT"](f"{post.belongs_to}"),
-            ]
+        if cast_vote("post", post.id, current_user.id, 1):
+            return jsonify(message="Up-voted Successfully"), HTTPStatus.ACCEPTED
+
+        return (
+            jsonify(message="You have already up-voted this post"),
+            HTTPStatus.CONFLICT,
         )
-        return jsonify(message="Up-voted Successfully"), HTTPStatus.ACCEPTED
 
     return jsonify(message="The post you selected does not exist"), HTTPStatus.NOT_FOUND
 
@@ -338,16 +655,16 @@ def downvote_a_post(post_id: int) -> tuple[Response, int]:
     Returns:
         tuple[Response, int]: Response Object and Status Code
     """
-    # TODO: Make down-votes unique per user
     post: Post = Post.get_by_id(post_id)
 
     if post and current_user:
-        post.update(votes=post.votes - 1)
+        if cast_vote("post", post.id, current_user.id, -1):
+            return jsonify(message="Down-voted Successfully"), HTTPStatus.ACCEPTED
 
-        cache.delete("all_posts")
-        cache.delete(f"post_{post_id}")
-        cache.delete(f"{current_user.username}_profile")
-        return jsonify(message="Down-voted Successfully"), HTTPStatus.ACCEPTED
+        return (
+            jsonify(message="You have already down-voted this post"),
+            HTTPStatus.CONFLICT,
+        )
 
     return jsonify(message="The post you selected does not exist"), HTTPStatus.NOT_FOUND
 
@@ -369,9 +686,9 @@ def delete_a_post(post_id: int) -> tuple[Response, int]:
     if post and current_user:
         post.delete()
 
-        cache.delete(f"post_{post_id}")
-        cache.delete("all_posts")
-        cache.delete(f"{current_user.username}_profile")
+        # Listings and profiles showing the post or its comments are filed under it
+        invalidate_tags(CACHE_TAGS["POST"](post_id))
+        schedule_warming(*listing_warmers([post.belongs_to]))
         return (
             jsonify(
                 post=PostViewSchema(
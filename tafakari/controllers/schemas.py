@@ -1,7 +1,9 @@
 import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, conint
+
+from ...configs import configs
 
 
 class BaseTafakariSchema(BaseModel):
@@ -28,6 +30,12 @@ class UserViewSchema(BaseTafakariSchema):
     username: str
 
 
+class UserSnapshotSchema(UserViewSchema):
+    """Signed in User Schema, cached instead of loading the user on every request"""
+
+    is_admin: bool
+
+
 class AllUsersViewSchema(BaseTafakariSchema):
     """Users list Response Schema"""
 
@@ -49,12 +57,73 @@ class CommentViewSchema(CommentRequestSchema):
     user: UserViewSchema
     post_id: Optional[int]
     parent_id: Optional[int]
+    reply_count: Optional[int]
+    replies_cursor: Optional[str]
 
 
 class AllCommentsViewSchema(BaseTafakariSchema):
     """All Comments Response Schema"""
 
     comments: Optional[list[CommentViewSchema]]
+    next_cursor: Optional[str]
+
+
+class CommentsPageQuerySchema(BaseTafakariSchema):
+    """Comments Page Query Schema"""
+
+    sort: Literal["top", "new"] = "top"
+    limit: conint(
+        ge=1, le=configs.COMMENTS_MAX_PAGE_SIZE
+    ) = configs.COMMENTS_PAGE_SIZE
+    cursor: Optional[str]
+
+
+class PostQuerySchema(BaseTafakariSchema):
+    """Single Post Query Schema"""
+
+    comment_sort: Literal["top", "new"] = "top"
+
+
+class CommentTreeViewSchema(CommentViewSchema):
+    """Comment with its nested replies Response Schema"""
+
+    replies: list["CommentTreeViewSchema"] = []
+
+
+CommentTreeViewSchema.update_forward_refs()
+
+
+class CommentThreadViewSchema(BaseTafakariSchema):
+    """Threaded Comments of a Post Response Schema"""
+
+    comments: list[CommentTreeViewSchema]
+
+
+class CommentContextViewSchema(BaseTafakariSchema):
+    """Comment Permalink Response Schema"""
+
+    ancestors: list[CommentViewSchema]
+    comment: CommentTreeViewSchema
+
+
+class CommentContextQuerySchema(BaseTafakariSchema):
+    """Comment Permalink Query Schema"""
+
+    context: conint(ge=0, le=configs.COMMENT_TREE_MAX_DEPTH) = 3
+    max_depth: conint(
+        ge=1, le=configs.COMMENT_TREE_MAX_DEPTH
+    ) = configs.COMMENT_TREE_DEPTH
+
+
+class CommentTreeQuerySchema(BaseTafakariSchema):
+    """Comment Tree Query Schema"""
+
+    max_depth: conint(
+        ge=1, le=configs.COMMENT_TREE_MAX_DEPTH
+    ) = configs.COMMENT_TREE_DEPTH
+    top_n_children: conint(
+        ge=1, le=configs.COMMENT_TREE_MAX_CHILDREN
+    ) = configs.COMMENT_TREE_CHILDREN
 
 
 class CreatePostRequestSchema(BaseTafakariSchema):
@@ -82,6 +151,21 @@ class AllPostsViewSchema(BaseTafakariSchema):
     """All Posts Response Schema"""
 
     posts: Optional[list[PostViewSchema]]
+    next_cursor: Optional[str]
+
+
+class PaginationQuerySchema(BaseTafakariSchema):
+    """Keyset Pagination Query Schema"""
+
+    limit: conint(ge=1, le=configs.POSTS_MAX_PAGE_SIZE) = configs.POSTS_PAGE_SIZE
+    cursor: Optional[str]
+
+
+class FeedQuerySchema(BaseTafakariSchema):
+    """Ranked Subreddit Feed Query Schema"""
+
+    sort: Literal["hot", "top", "new", "controversial"] = "hot"
+    limit: conint(ge=1, le=configs.POSTS_MAX_PAGE_SIZE) = configs.POSTS_PAGE_SIZE
 
 
 class CreateSubredditRequestSchema(BaseTafakariSchema):
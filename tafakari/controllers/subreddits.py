@@ -1,3 +1,4 @@
+import json
 from http import HTTPStatus
 
 import pendulum
@@ -7,10 +8,29 @@ from flask_pydantic import validate
 from sqlalchemy import and_
 from sqlalchemy.exc import IntegrityError
 
-from ..extensions import cache, limiter
+from ..extensions import limiter
+from ..models.posts import Post
 from ..models.subreddit import Subreddit
 from ..models.users import User
-from ..utils import CACHE_KEYS_REFERENCE, cache_invalidator, cache_setter
+from ..responses import (
+    CACHE_CONTROL_POLICIES,
+    cache_control,
+    cacheable_response,
+    cached_response,
+)
+from ..utils import (
+    CACHE_GENERATIONS,
+    CACHE_KEYS_REFERENCE,
+    CACHE_TAGS,
+    bump_generation,
+    cache_getter,
+    cache_setter,
+    generational_key,
+    get_or_recompute,
+    invalidate_memoized,
+    invalidate_tags,
+    refresh_entry,
+)
 from .schemas import (
     AllSubredditsViewSchema,
     CreateSubredditRequestSchema,
@@ -40,7 +60,8 @@ def create_subreddit(body: CreateSubredditRequestSchema) -> tuple[Response, int]
             name=body.name, description=body.description, created_by=current_user.id
         )
 
-        new_subreddit.user.append(current_user)
+        # current_user is a cached snapshot; the relationship needs the User row
+        new_subreddit.user.append(User.get_by_id(current_user.id))
         new_subreddit.save()
 
         created_subreddit = SubredditViewSchema(
@@ -51,8 +72,14 @@ def create_subreddit(body: CreateSubredditRequestSchema) -> tuple[Response, int]
             created_on=new_subreddit.created_on,
         ).dict()
 
-        cache_key = CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](f"{new_subreddit.id}")
-        cache_setter(cache_key, created_subreddit)
+        invalidate_tags(
+            CACHE_TAGS["SUBREDDITS"], CACHE_TAGS["USER"](current_user.username)
+        )
+        cache_key = generational_key(
+            CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](f"{new_subreddit.id}"),
+            CACHE_GENERATIONS["SUBREDDIT"](new_subreddit.id),
+        )
+        cache_setter(cache_key, cacheable_response(created_subreddit, kind=None))
         return jsonify(message="created"), HTTPStatus.CREATED
 
     return (
@@ -85,6 +112,9 @@ def update_a_subreddit(
             updated_subreddit = subreddit.update(
                 name=body.name, description=body.description, modified_on=pendulum.now()
             )
+            invalidate_memoized(
+                "JOINED_SUBREDDITS", *[member.id for member in subreddit.user]
+            )
 
             response = SubredditViewSchema(
                 id=updated_subreddit.id,
@@ -94,18 +124,14 @@ def update_a_subreddit(
                 members=subreddit.get_members(),
             ).dict()
 
-            # Build relevant cache keys for setting and invalidation
-            subreddit_cache_key = CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](
-                f"{updated_subreddit.id}"
-            )
-            current_user_profile_cache_key = CACHE_KEYS_REFERENCE["PROFILE"](
-                f"{current_user.username}"
-            )
-            all_subreddits_cache_key = CACHE_KEYS_REFERENCE["ALL_SUBREDDITS"]
-            cache_setter(subreddit_cache_key, response)
-            cache_invalidator(
-                [current_user_profile_cache_key, all_subreddits_cache_key]
+            # Listings and member profiles showing the subreddit are filed under it
+            invalidate_tags(CACHE_TAGS["SUBREDDIT"](updated_subreddit.id))
+            bump_generation(CACHE_GENERATIONS["SUBREDDIT"](updated_subreddit.id))
+            subreddit_cache_key = generational_key(
+                CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](f"{updated_subreddit.id}"),
+                CACHE_GENERATIONS["SUBREDDIT"](updated_subreddit.id),
             )
+            cache_setter(subreddit_cache_key, cacheable_response(response, kind=None))
             return jsonify(response), HTTPStatus.ACCEPTED
 
         return (
@@ -120,6 +146,7 @@ def update_a_subreddit(
 
 
 @subreddits.route("/subreddits", methods=["GET"])
+@cache_control(CACHE_CONTROL_POLICIES["PUBLIC"])
 @limiter.limit("1000/day")
 def get_all_subreddits() -> tuple[Response, int]:
     """Get all subreddits
@@ -127,39 +154,63 @@ def get_all_subreddits() -> tuple[Response, int]:
     Returns:
         tuple[Response, int]: Response Object and Status Code
     """
-    cache_key = CACHE_KEYS_REFERENCE["ALL_SUBREDDITS"]
-    cached_data = cache.get(cache_key)
-
-    if not cached_data:
-        all_subs = Subreddit.query.all()
-
-        all_subs_response = []
-        if all_subs:
-            for sub in all_subs:
-                subreddit_schema = SubredditViewSchema(
-                    id=sub.id,
-                    name=sub.name,
-                    description=sub.description,
-                    members=sub.get_members(),
-                    created_on=sub.created_on,
-                )
+    entry = get_or_recompute(
+        CACHE_KEYS_REFERENCE["ALL_SUBREDDITS"],
+        build_all_subreddits,
+        tags=all_subreddits_cache_tags,
+    )
+    return cached_response(entry)
 
-                all_subs_response.append(subreddit_schema)
 
-            response = AllSubredditsViewSchema(subreddits=all_subs_response).dict()
+def build_all_subreddits() -> dict:
+    """Builds the listing of all subreddits
+
+    Returns:
+        dict: The listing as a cacheable_response
+    """
+    all_subs = Subreddit.query.all()
+
+    if not all_subs:
+        return cacheable_response(
+            {"message": "Subreddit Not Found"}, status=HTTPStatus.NOT_FOUND, kind=None
+        )
+
+    all_subs_response = []
+    for sub in all_subs:
+        subreddit_schema = SubredditViewSchema(
+            id=sub.id,
+            name=sub.name,
+            description=sub.description,
+            members=sub.get_members(),
+            created_on=sub.created_on,
+        )
+
+        all_subs_response.append(subreddit_schema)
+
+    return cacheable_response(
+        AllSubredditsViewSchema(subreddits=all_subs_response).dict(), kind=None
+    )
 
-            cache_setter(cache_key, response)
-            return (
-                jsonify(response),
-                HTTPStatus.OK,
-            )
 
-        return jsonify(message="Subreddit Not Found"), HTTPStatus.NOT_FOUND
+def all_subreddits_cache_tags(entry: dict) -> list[str]:
+    """Cache tags of the cached subreddits listing
 
-    return jsonify(cached_data), HTTPStatus.OK
+    Args:
+        entry (dict): The listing's cacheable_response
+
+    Returns:
+        list[str]: The listing's tag and one tag per listed subreddit
+    """
+    # Decoded only when the listing is rebuilt, never on a hit
+    listed = json.loads(entry["body"]).get("subreddits", [])
+    return [
+        CACHE_TAGS["SUBREDDITS"],
+        *[CACHE_TAGS["SUBREDDIT"](subreddit["id"]) for subreddit in listed],
+    ]
 
 
 @subreddits.route("/subreddits/<int:subreddit_id>", methods=["GET"])
+@cache_control(CACHE_CONTROL_POLICIES["PUBLIC"])
 @limiter.limit("1000/day")
 def get_subreddit_by_id(subreddit_id: int) -> tuple[Response, int]:
     """Get a single subreddit
@@ -170,30 +221,89 @@ def get_subreddit_by_id(subreddit_id: int) -> tuple[Response, int]:
     Returns:
         tuple[Response, int]: Response Object and Status Code
     """
-    cache_key = CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](subreddit_id)
-    cached_data = cache.get(cache_key)
-
-    if not cached_data:
-        subreddit = Subreddit.query.filter(Subreddit.id == subreddit_id).first()
+    cache_key = subreddit_key(subreddit_id)
+    cached_entry = cache_getter(cache_key)
 
-        if subreddit:
-            response = SubredditViewSchema(
-                id=subreddit.id,
-                name=subreddit.name,
-                description=subreddit.description,
-                members=subreddit.get_members(),
-                created_on=subreddit.created_on,
-            ).dict()
+    if not cached_entry:
+        entry = build_subreddit(subreddit_id)
 
-            cache_setter(cache_key, response)
-            return (
-                jsonify(response),
-                HTTPStatus.OK,
-            )
+        if entry:
+            cache_setter(cache_key, entry)
+            return cached_response(entry)
 
         return jsonify(message="No Subreddit Found"), HTTPStatus.NOT_FOUND
 
-    return jsonify(cached_data), HTTPStatus.OK
+    return cached_response(cached_entry)
+
+
+def subreddit_key(subreddit_id: int) -> str:
+    """Cache key of a subreddit under its current generation
+
+    Args:
+        subreddit_id (int): Subreddit Id
+
+    Returns:
+        str: The generational cache key
+    """
+    return generational_key(
+        CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](subreddit_id),
+        CACHE_GENERATIONS["SUBREDDIT"](subreddit_id),
+    )
+
+
+def build_subreddit(subreddit_id: int) -> dict | None:
+    """Builds the view of a single subreddit
+
+    Args:
+        subreddit_id (int): Subreddit Id
+
+    Returns:
+        dict | None: The subreddit as a cacheable_response, None if it does not exist
+    """
+    subreddit = Subreddit.query.filter(Subreddit.id == subreddit_id).first()
+
+    if not subreddit:
+        return None
+
+    response = SubredditViewSchema(
+        id=subreddit.id,
+        name=subreddit.name,
+        description=subreddit.description,
+        members=subreddit.get_members(),
+        created_on=subreddit.created_on,
+    ).dict()
+
+    return cacheable_response(response, kind=None)
+
+
+def warm_subreddit(subreddit_id: int) -> bool:
+    """Caches the view of a single subreddit ahead of its first request
+
+    Args:
+        subreddit_id (int): Subreddit Id
+
+    Returns:
+        bool: Whether it was cached; False if the subreddit does not exist
+    """
+    entry = build_subreddit(subreddit_id)
+
+    if entry:
+        cache_setter(subreddit_key(subreddit_id), entry)
+
+    return entry is not None
+
+
+def warm_all_subreddits() -> bool:
+    """Rebuilds the listing of all subreddits
+
+    Returns:
+        bool: Whether it was rebuilt; False when another worker already is
+    """
+    return refresh_entry(
+        CACHE_KEYS_REFERENCE["ALL_SUBREDDITS"],
+        build_all_subreddits,
+        tags=all_subreddits_cache_tags,
+    )
 
 
 @subreddits.route("/join/subreddits/<int:subreddit_id>", methods=["GET"])
@@ -212,9 +322,15 @@ def join_a_subreddit(subreddit_id: int) -> tuple[Response, int]:
 
     if subreddit and current_user:
         try:
-            subreddit.user.append(current_user)
+            subreddit.user.append(User.get_by_id(current_user.id))
             subreddit.save()
 
+            # Every member's joined subreddits embed this subreddit's member list
+            invalidate_memoized("SUBREDDIT_MEMBERS", subreddit.id)
+            invalidate_memoized(
+                "JOINED_SUBREDDITS", *[member.id for member in subreddit.user]
+            )
+
             updated_subreddit = SubredditViewSchema(
                 id=subreddit.id,
                 name=subreddit.name,
@@ -223,14 +339,17 @@ def join_a_subreddit(subreddit_id: int) -> tuple[Response, int]:
                 created_on=subreddit.created_on,
             ).dict()
 
-            subreddit_id_cache_key = CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](subreddit.id)
-            cache_setter(subreddit_id_cache_key, updated_subreddit)
-            cache_invalidator(
-                [
-                    CACHE_KEYS_REFERENCE["ALL_SUBREDDITS"],
-                    CACHE_KEYS_REFERENCE["PROFILE"](current_user.username),
-                    subreddit_id_cache_key,
-                ]
+            invalidate_tags(
+                CACHE_TAGS["SUBREDDIT"](subreddit.id),
+                CACHE_TAGS["USER"](current_user.username),
+            )
+            bump_generation(CACHE_GENERATIONS["SUBREDDIT"](subreddit.id))
+            cache_setter(
+                generational_key(
+                    CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](subreddit.id),
+                    CACHE_GENERATIONS["SUBREDDIT"](subreddit.id),
+                ),
+                cacheable_response(updated_subreddit, kind=None),
             )
             return (
                 jsonify(
@@ -266,16 +385,22 @@ def delete_a_subreddit(subreddit_id: int) -> tuple[Response, int]:
         ).first()
 
         if subreddit_creator:
+            member_ids = [member.id for member in subreddit_creator.user]
+            post_ids = [
+                post_id
+                for post_id, in Post.query.with_entities(Post.id).filter(
+                    Post.belongs_to == subreddit_id
+                )
+            ]
             subreddit_creator.delete()
-
-            cache.delete(f"subreddit_{subreddit_id}")
-            cache.delete("all_subs")
-            cache_invalidator(
-                [
-                    CACHE_KEYS_REFERENCE["ALL_SUBREDDITS"],
-                    CACHE_KEYS_REFERENCE["SUBREDDIT_ID"](subreddit_id),
-                    CACHE_KEYS_REFERENCE["PROFILE"](current_user.username),
-                ]
+            invalidate_memoized("SUBREDDIT_MEMBERS", subreddit_id)
+            invalidate_memoized("JOINED_SUBREDDITS", *member_ids)
+
+            # The subreddit's posts are deleted with it
+            bump_generation(CACHE_GENERATIONS["SUBREDDIT"](subreddit_id))
+            invalidate_tags(
+                CACHE_TAGS["SUBREDDIT"](subreddit_id),
+                *[CACHE_TAGS["POST"](post_id) for post_id in post_ids],
             )
             return jsonify(message="Deleted Successfully"), HTTPStatus.ACCEPTED
 
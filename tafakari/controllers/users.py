@@ -4,12 +4,23 @@ from flask import Blueprint, Response, current_app, jsonify
 from flask_jwt_extended import current_user, jwt_required
 
 from ...configs import configs
-from ..extensions import cache
 from ..models.comments import Comments
 from ..models.posts import Post
 from ..models.subreddit import Subreddit
 from ..models.users import User
-from ..utils import CACHE_KEYS_REFERENCE, cache_setter, get_logger_instance
+from ..utils import (
+    CACHE_KEYS_REFERENCE,
+    CACHE_TAGS,
+    cache_getter,
+    cache_setter,
+    get_logger_instance,
+)
+from ..responses import (
+    CACHE_CONTROL_POLICIES,
+    cache_control,
+    cacheable_response,
+    cached_response,
+)
 from .schemas import (
     AllCommentsViewSchema,
     AllPostsViewSchema,
@@ -25,6 +36,7 @@ user = Blueprint("user", __name__)
 
 
 @user.route("/profile", methods=["GET"])
+@cache_control(CACHE_CONTROL_POLICIES["PRIVATE"])
 @jwt_required(fresh=True)
 def get_profile() -> tuple[Response | str, int]:
     """Get current signed in user's profile
@@ -33,10 +45,10 @@ def get_profile() -> tuple[Response | str, int]:
         tuple[Response | str, int]: Response Object and Status Code
     """
     profile_cache_key = CACHE_KEYS_REFERENCE["PROFILE"](f"{current_user.username}")
-    cached_data = cache.get(profile_cache_key)
+    cached_entry = cache_getter(profile_cache_key)
     logger = get_logger_instance(current_app=current_app)
 
-    if not cached_data:
+    if not cached_entry:
         if current_user:
             logger.info(
                 "Retrieving profile data for user %s from the database.",
@@ -123,12 +135,29 @@ def get_profile() -> tuple[Response | str, int]:
                     configs.CACHE_DEFAULT_TIMEOUT,
                 )
 
-                cache_setter(profile_cache_key, response)
+                # Filed under everything shown, including the posts commented on
+                entry = cacheable_response(response, kind=None)
+                cache_setter(
+                    profile_cache_key,
+                    entry,
+                    tags=[
+                        CACHE_TAGS["USER"](profile.username),
+                        *[
+                            CACHE_TAGS["SUBREDDIT"](subreddit.id)
+                            for subreddit in all_subreddits.subreddits
+                        ],
+                        *[CACHE_TAGS["POST"](post.id) for post in posts_schema.posts],
+                        *[
+                            CACHE_TAGS["POST"](comment.post_id)
+                            for comment in comments_schema.comments
+                        ],
+                    ],
+                )
                 logger.info(
                     "Successfully served profile data for user %s from the database.",
                     current_user.username,
                 )
-                return jsonify(response), HTTPStatus.OK
+                return cached_response(entry)
 
         logger.error(
             "Returning 404 Not Found response for user %s: User not found.",
@@ -137,4 +166,4 @@ def get_profile() -> tuple[Response | str, int]:
         return jsonify(message="User not Found"), HTTPStatus.NOT_FOUND
 
     logger.info("Serving cached profile data for username %s", current_user.username)
-    return jsonify(cached_data), HTTPStatus.OK
+    return cached_response(cached_entry)
@@ -1,3 +1,4 @@
+import redis
 from flask_bcrypt import Bcrypt
 from flask_caching import Cache
 from flask_cors import CORS
@@ -8,6 +9,10 @@ from flask_migrate import Migrate
 
 from tafakari.configs import configs
 
+from .localcache import LocalCache
+from .metricsbuffer import MetricsBuffer
+from .revocations import RevocationFilter
+
 bcrypt = Bcrypt()
 jwt = JWTManager()
 cache = Cache()
@@ -20,3 +25,22 @@ limiter = Limiter(
     strategy="fixed-window",
     default_limits=["2000 per day", "150 per hour"],
 )
+
+# Application state kept in Redis outside of the response cache, e.g. buffered votes
+redis_client = redis.StrictRedis(
+    host=configs.REDIS_HOSTNAME, port=configs.REDIS_PORT, db=2, decode_responses=True
+)
+
+# Per worker copies of hot Redis cache entries, kept coherent over pub/sub
+local_cache = LocalCache(
+    maxsize=configs.LOCAL_CACHE_SIZE, timeout=configs.LOCAL_CACHE_TIMEOUT
+)
+
+# Per worker cache read counters, periodically added to the cache_stats hash
+cache_metrics = MetricsBuffer(interval=configs.METRICS_INTERVAL)
+
+# Per worker request counters, periodically added to the request_metrics hash
+request_metrics = MetricsBuffer(interval=configs.METRICS_INTERVAL)
+
+# Per worker copy of the revoked token ids, kept in sync over pub/sub
+revoked_tokens = RevocationFilter(interval=configs.JWT_BLOCKLIST_SYNC_INTERVAL)
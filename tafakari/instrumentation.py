@@ -0,0 +1,346 @@
+import functools
+import os
+import random
+import socket
+import time
+from collections import defaultdict
+from http import HTTPStatus
+from logging import getLogger
+from threading import Lock
+from typing import Any, Callable, Final
+
+import redis
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..configs import configs
+from .extensions import redis_client, request_metrics
+from .utils import get_client_ip_address
+
+logger = getLogger("default")
+
+# Redis hash of request metrics summed over every worker, with fields named after the
+# Prometheus series they export, e.g. 'http_requests_total{route="/posts",...}'
+REQUEST_METRICS: Final[str] = "request_metrics"
+
+# Redis hash of each worker's last sampled count of requests in flight
+REQUESTS_IN_FLIGHT: Final[str] = "requests_in_flight"
+
+# Redis sorted set of the workers sampling requests in flight, scored by last report
+IN_FLIGHT_REPORTS: Final[str] = "requests_in_flight:reported"
+
+# Exported metrics, as (type, help text)
+METRICS: Final[dict[str, tuple[str, str]]] = {
+    "http_requests_total": ("counter", "Requests handled, by route and status code"),
+    "http_request_duration_seconds": ("histogram", "Request latency, by route"),
+    "http_requests_in_flight": ("gauge", "Requests being handled, sampled per worker"),
+    "http_request_db_queries": ("histogram", "SQL statements issued per request"),
+    "db_query_duration_seconds_total": ("counter", "Time spent in SQL, by route"),
+    "db_n_plus_one_suspects_total": (
+        "counter",
+        "Statements repeated with different parameters within a request, by route",
+    ),
+    "redis_commands_total": ("counter", "Redis round trips, by route"),
+    "log_records_dropped_total": ("counter", "Log records dropped by full queues"),
+}
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS: Final[tuple[float, ...]] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS: Final[tuple[int, ...]] = (0, 1, 2, 5, 10, 25, 50, 100)
+
+WORKER: Final[str] = f"{socket.gethostname()}:{os.getpid()}"
+
+_in_flight = 0
+_in_flight_lock = Lock()
+
+
+def init_instrumentation(app: Flask) -> None:
+    """Times every request, profiling the SQL statements and Redis calls it makes
+
+    Slow statements and suspected N+1 patterns are logged with the route they came
+    from, and outside of production responses get a Server-Timing header. Finished
+    requests are sampled into a structured access log.
+
+    Args:
+        app (Flask): The Flask App Object
+    """
+    # Started ahead of every other hook, so requests they reject, such as the
+    # limiter's 429s, are still timed, counted and logged
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.after_request(_record_request)
+    app.teardown_request(_finish_request)
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    # Every command, and every pipeline as a whole, is one round trip
+    if not hasattr(redis.Redis.execute_command, "__wrapped__"):
+        redis.Redis.execute_command = _count_redis_call(redis.Redis.execute_command)
+        redis.client.Pipeline.execute = _count_redis_call(redis.client.Pipeline.execute)
+
+
+def _start_request() -> None:
+    """Starts the request's clock and counters"""
+    global _in_flight
+
+    with _in_flight_lock:
+        _in_flight += 1
+
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+    g.db_statements = defaultdict(list)
+    g.redis_calls = 0
+
+
+def _record_request(response: Response) -> Response:
+    """Records the request's latency, status code, SQL statements and Redis calls"""
+    if "request_started" not in g:
+        return response
+
+    labels = {
+        "blueprint": request.blueprint or "app",
+        "route": request.url_rule.rule if request.url_rule else "unmatched",
+        "method": request.method,
+    }
+    duration = time.perf_counter() - g.request_started
+
+    request_metrics.increment(
+        _series("http_requests_total", labels, status=response.status_code)
+    )
+    _observe("http_request_duration_seconds", duration, LATENCY_BUCKETS, labels)
+    _observe("http_request_db_queries", g.db_queries, QUERY_COUNT_BUCKETS, labels)
+    request_metrics.increment(
+        _series("db_query_duration_seconds_total", labels), g.db_seconds
+    )
+    request_metrics.increment(_series("redis_commands_total", labels), g.redis_calls)
+
+    for statement in suspected_n_plus_one(g.db_statements):
+        logger.warning(
+            "Suspected N+1 in %s %s: %d runs of %s",
+            request.method,
+            labels["route"],
+            len(g.db_statements[statement]),
+            statement,
+        )
+        request_metrics.increment(_series("db_n_plus_one_suspects_total", labels))
+
+    if configs.SERVER_TIMING:
+        response.headers["Server-Timing"] = (
+            f'db;dur={g.db_seconds * 1000:.1f};desc="{g.db_queries} queries", '
+            f'redis;desc="{g.redis_calls} calls", '
+            f"total;dur={duration * 1000:.1f}"
+        )
+
+    _log_access(labels["route"], response.status_code, duration)
+    return response
+
+
+def _log_access(route: str, status: int, duration: float) -> None:
+    """Logs a finished request as a JSON record, sampling the fast successful ones"""
+    if (
+        status < HTTPStatus.BAD_REQUEST
+        and duration < configs.ACCESS_LOG_SLOW_THRESHOLD
+        and random.random() >= configs.ACCESS_LOG_SAMPLE_RATE
+    ):
+        return
+
+    lookups = g.get("cache_hits", 0) + g.get("cache_misses", 0)
+    logger.info(
+        "%s %s %s",
+        request.method,
+        route,
+        status,
+        extra={
+            "access": {
+                "method": request.method,
+                "route": route,
+                "path": request.path,
+                "status": status,
+                "duration_ms": round(duration * 1000, 2),
+                "db_ms": round(g.db_seconds * 1000, 2),
+                "db_queries": g.db_queries,
+                "cache_hit": g.get("cache_misses", 0) == 0 if lookups else None,
+                "ip": get_client_ip_address(request),
+            }
+        },
+    )
+
+
+def suspected_n_plus_one(statements: dict[str, list]) -> list[str]:
+    """Picks the statements a request ran over and over with different parameters
+
+    Such statements usually come from a loop loading rows one at a time, where one
+    query for all of them would do.
+
+    Args:
+        statements (dict[str, list]): Each statement run, with the parameters of every run
+
+    Returns:
+        list[str]: Statements run at least N_PLUS_ONE_THRESHOLD times
+    """
+    return [
+        statement
+        for statement, runs in statements.items()
+        if len(runs) >= configs.N_PLUS_ONE_THRESHOLD and len(set(runs)) > 1
+    ]
+
+
+def _finish_request(error: BaseException | None) -> None:
+    """Takes the request out of flight, sending the worker's metrics when due"""
+    global _in_flight
+
+    # Requests stopped by an earlier before_request hook were never counted in
+    if "request_started" in g:
+        with _in_flight_lock:
+            _in_flight -= 1
+
+    if request_metrics.due():
+        flush_request_metrics()
+
+
+def flush_request_metrics() -> None:
+    """Adds this worker's pending request metrics to REQUEST_METRICS"""
+    pipeline = redis_client.pipeline(transaction=False)
+
+    for field, amount in request_metrics.drain().items():
+        if isinstance(amount, float):
+            pipeline.hincrbyfloat(REQUEST_METRICS, field, amount)
+        else:
+            pipeline.hincrby(REQUEST_METRICS, field, amount)
+
+    pipeline.hset(REQUESTS_IN_FLIGHT, WORKER, _in_flight)
+    pipeline.zadd(IN_FLIGHT_REPORTS, {WORKER: time.time()})
+    pipeline.execute()
+
+
+def render_metrics() -> str:
+    """Renders the metrics of every worker in the Prometheus text format
+
+    Returns:
+        str: The exposition
+    """
+    flush_request_metrics()
+
+    series: dict[str, list[tuple[str, str]]] = {metric: [] for metric in METRICS}
+
+    for name, value in redis_client.hgetall(REQUEST_METRICS).items():
+        metric = name.split("{", 1)[0]
+        if metric not in METRICS:
+            metric = metric.rsplit("_", 1)[0]
+        series.setdefault(metric, []).append((name, value))
+
+    in_flight = sum(int(value) for value in _live_in_flight_samples())
+    series["http_requests_in_flight"] = [("http_requests_in_flight", str(in_flight))]
+
+    lines = []
+    for metric, (metric_type, help_text) in METRICS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        lines.extend(
+            f"{name} {value}"
+            for name, value in sorted(series[metric], key=_series_order)
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def _live_in_flight_samples() -> list[str]:
+    """Returns the in flight samples of live workers, pruning workers gone quiet"""
+    stale_workers = redis_client.zrangebyscore(
+        IN_FLIGHT_REPORTS, "-inf", time.time() - configs.METRICS_INTERVAL * 3
+    )
+
+    pipeline = redis_client.pipeline()
+    if stale_workers:
+        pipeline.hdel(REQUESTS_IN_FLIGHT, *stale_workers)
+        pipeline.zrem(IN_FLIGHT_REPORTS, *stale_workers)
+    pipeline.hvals(REQUESTS_IN_FLIGHT)
+
+    return pipeline.execute()[-1]
+
+
+def _series(metric: str, labels: dict[str, Any], **extra_labels: Any) -> str:
+    """Names a series the way the Prometheus text format does"""
+    rendered = ",".join(
+        f'{label}="{_escape_label(value)}"'
+        for label, value in {**labels, **extra_labels}.items()
+    )
+    return f"{metric}{{{rendered}}}"
+
+
+def _escape_label(value: Any) -> str:
+    """Escapes a label value for the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _observe(metric: str, value: float, buckets: tuple, labels: dict[str, Any]) -> None:
+    """Adds an observation to a histogram's cumulative buckets, sum and count"""
+    for bound in buckets:
+        if value <= bound:
+            request_metrics.increment(_series(f"{metric}_bucket", labels, le=bound))
+    request_metrics.increment(_series(f"{metric}_bucket", labels, le="+Inf"))
+    request_metrics.increment(_series(f"{metric}_sum", labels), float(value))
+    request_metrics.increment(_series(f"{metric}_count", labels))
+
+
+def _series_order(item: tuple[str, str]) -> tuple:
+    """Sorts series by labels, with histogram buckets in increasing bound order"""
+    name = item[0]
+    labels, _, bound = name.partition(',le="')
+    bound = bound.rstrip('"}')
+    return labels, float("inf") if bound == "+Inf" else float(bound or 0), name
+
+
+def _before_cursor_execute(connection: Any, *args: Any) -> None:
+    """Starts timing a SQL statement"""
+    connection.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    connection: Any, cursor: Any, statement: str, parameters: Any, *args: Any
+) -> None:
+    """Adds a finished SQL statement to the request's profile, logging it when slow"""
+    elapsed = time.perf_counter() - connection.info["query_started"].pop()
+    in_request = has_request_context() and "db_queries" in g
+
+    if elapsed >= configs.SLOW_QUERY_THRESHOLD:
+        logger.warning(
+            "Slow query in %s took %.1f ms: %s",
+            f"{request.method} {request.url_rule or 'unmatched'}"
+            if in_request
+            else "background",
+            elapsed * 1000,
+            statement,
+        )
+
+    if in_request:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+        g.db_statements[statement].append(repr(parameters))
+
+
+def _count_redis_call(method: Callable) -> Callable:
+    """Wraps a Redis client method to count its calls against the current request"""
+
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if has_request_context() and "redis_calls" in g:
+            g.redis_calls += 1
+        return method(*args, **kwargs)
+
+    return wrapper
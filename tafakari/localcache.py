@@ -0,0 +1,100 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+
+class LocalCache:
+    """A bounded, per worker LRU cache whose entries expire after a short TTL
+
+    Values are shared between requests and must be treated as read-only.
+
+    Args:
+        maxsize (int): Entries kept before the least recently used is evicted
+        timeout (float): Seconds an entry is served for
+    """
+
+    def __init__(self, maxsize: int, timeout: float) -> None:
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Returns a live entry, None when missing or expired
+
+        Args:
+            key (Hashable): The key
+
+        Returns:
+            Any: The cached value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, timeout: float | None = None) -> None:
+        """Caches a value, evicting the least recently used entry when full
+
+        Args:
+            key (Hashable): The key
+            value (Any): The value
+            timeout (float | None, optional): Overrides the default TTL. Defaults to None.
+        """
+        if not self.maxsize:
+            return
+
+        expires_at = time.monotonic() + (self.timeout if timeout is None else timeout)
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: Hashable) -> None:
+        """Drops entries
+
+        Args:
+            *keys (Hashable): The keys to drop
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns the size limits and hit ratio of the cache
+
+        Returns:
+            dict[str, int | float]: Size, limits, hits, misses, evictions and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "timeout": self.timeout,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
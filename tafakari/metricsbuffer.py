@@ -0,0 +1,61 @@
+import time
+from collections import Counter
+from threading import Lock
+
+
+class MetricsBuffer:
+    """Per worker metric counters, handed over in batches for aggregation in Redis
+
+    Counting locally keeps a Redis round trip off every cache read and request; the
+    counts are drained every interval instead.
+
+    Args:
+        interval (float): Seconds between drains
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._pending: Counter = Counter()
+        self._drained_at = time.monotonic()
+        self._lock = Lock()
+
+    def increment(self, field: str, amount: int | float = 1) -> None:
+        """Adds to a counter
+
+        Args:
+            field (str): The counter's Redis hash field
+            amount (int | float, optional): Amount to add. Defaults to 1.
+        """
+        with self._lock:
+            self._pending[field] += amount
+
+    def record(self, family: str, **stats: int) -> None:
+        """Adds to the counters of a key family
+
+        Args:
+            family (str): The CACHE_KEYS_REFERENCE family
+            **stats (int): Amounts to add, per stat
+        """
+        with self._lock:
+            for stat, amount in stats.items():
+                self._pending[f"{family}:{stat}"] += amount
+
+    def due(self) -> bool:
+        """Whether the counters are due to be drained
+
+        Returns:
+            bool: True once the interval has elapsed since the last drain
+        """
+        return time.monotonic() - self._drained_at >= self.interval
+
+    def drain(self) -> dict[str, int | float]:
+        """Takes the counters accumulated since the last drain
+
+        Returns:
+            dict[str, int | float]: Amounts per Redis hash field
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._drained_at = time.monotonic()
+
+        return dict(pending)
@@ -1,14 +1,32 @@
 import pendulum
+from sqlalchemy import (
+    cast,
+    column,
+    event,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from ...configs import configs
 from ..controllers.schemas import (
     AllCommentsViewSchema,
+    CommentThreadViewSchema,
+    CommentTreeViewSchema,
     CommentViewSchema,
     UserViewSchema,
 )
 from ..database import db
-from ..extensions import cache
+from ..utils import decode_cursor, encode_cursor, memoize_by_id
 from . import CRUDMixin
+from .users import User
+
+COMMENT_SORTS: tuple[str, ...] = ("top", "new")
 
 
 class Comments(db.Model, CRUDMixin):
@@ -17,6 +35,23 @@ class Comments(db.Model, CRUDMixin):
     """
 
     __tablename__ = "comments"
+    __table_args__ = (
+        db.Index("ix_comments_parent_id", "parent_id"),
+        db.Index(
+            "ix_comments_post_id_parent_id_votes", "post_id", "parent_id", "votes", "id"
+        ),
+        db.Index(
+            "ix_comments_post_id_parent_id_created_on",
+            "post_id",
+            "parent_id",
+            "created_on",
+            "id",
+        ),
+        db.Index(
+            "ix_comments_path", "path", postgresql_ops={"path": "text_pattern_ops"}
+        ),
+        {"extend_existing": True},
+    )
 
     comment = db.Column(db.String(1000), nullable=False, unique=False)
     votes = db.Column(db.Integer, default=1, nullable=False)
@@ -29,6 +64,9 @@ class Comments(db.Model, CRUDMixin):
     post_id = db.Column(db.Integer, db.ForeignKey("post.id"), primary_key=True)
     parent_id = db.Column(db.Integer, db.ForeignKey("comments.id"), nullable=True)
 
+    # Materialised ancestry: Ids from the top-level comment down to this one, "1/5/9/"
+    path = db.Column(db.String, nullable=True)
+
     # Relationships
     user = db.relationship("User", back_populates="comments", uselist=False)
     post = db.relationship("Post", back_populates="comments", uselist=False)
@@ -42,7 +80,260 @@ class Comments(db.Model, CRUDMixin):
     def __repr__(self) -> str:
         return f"<Comment: {self.comment}>"
 
-    @cache.memoize(timeout=configs.CACHE_DEFAULT_TIMEOUT)
+    @classmethod
+    def bulk_apply_votes(cls, deltas: dict[int, dict[str, int]]) -> list:
+        """Adds buffered vote deltas to many comments in one UPDATE
+
+        Args:
+            deltas (dict[int, dict[str, int]]): Comment Id to its votes delta
+
+        Returns:
+            list: (id, post_id, user_id, parent_id) rows of the updated comments
+        """
+        rows = values(
+            column("id", db.Integer), column("votes", db.Integer), name="vote_deltas"
+        ).data(
+            [
+                (comment_id, delta.get("votes", 0))
+                for comment_id, delta in deltas.items()
+            ]
+        )
+
+        statement = (
+            update(cls)
+            .where(cls.id == rows.c.id)
+            .values({cls.votes: cls.votes + rows.c.votes})
+            .returning(cls.id, cls.post_id, cls.user_id, cls.parent_id)
+            .execution_options(synchronize_session=False)
+        )
+        return db.session.execute(statement).all()
+
+    @classmethod
+    def get_comments_page(
+        cls,
+        post_id: int,
+        parent_id: int | None = None,
+        sort: str = "top",
+        limit: int = configs.COMMENTS_PAGE_SIZE,
+        after: tuple | None = None,
+    ) -> AllCommentsViewSchema:
+        """Returns a keyset paginated page of a Post's comments or a comment's replies
+
+        Every comment on the page carries its reply count and, when it has replies, a
+        replies_cursor that fetches the first page of them.
+
+        Args:
+            post_id (int): The Post Id
+            parent_id (int | None, optional): Comment whose replies to page through;
+                None pages through top-level comments. Defaults to None.
+            sort (str, optional): "top" (by votes) or "new". Defaults to "top".
+            limit (int, optional): Page size. Defaults to configs.COMMENTS_PAGE_SIZE.
+            after (tuple | None, optional): Sort key and Id of the last comment of the
+                previous page. Defaults to None.
+
+        Returns:
+            AllCommentsViewSchema: The page of comments and the next page's cursor
+        """
+        sort_key = cls.votes if sort == "top" else cls.created_on
+
+        page_query = cls.query.options(joinedload(cls.user)).filter(
+            cls.post_id == post_id, cls.parent_id == parent_id
+        )
+        if after:
+            page_query = page_query.filter(tuple_(sort_key, cls.id) < after)
+
+        # Fetch one extra row to learn whether another page follows this one
+        page = (
+            page_query.order_by(sort_key.desc(), cls.id.desc()).limit(limit + 1).all()
+        )
+        has_next_page = len(page) > limit
+        page = page[:limit]
+
+        reply_counts = (
+            dict(
+                db.session.execute(
+                    select(cls.parent_id, func.count())
+                    .where(cls.parent_id.in_([comment.id for comment in page]))
+                    .group_by(cls.parent_id)
+                ).all()
+            )
+            if page
+            else {}
+        )
+
+        all_comments = [
+            CommentViewSchema(
+                comment=comment.comment,
+                id=comment.id,
+                votes=comment.votes,
+                created_on=comment.created_on,
+                user=UserViewSchema.from_orm(comment.user),
+                post_id=comment.post_id,
+                parent_id=comment.parent_id,
+                reply_count=reply_counts.get(comment.id, 0),
+                replies_cursor=encode_cursor(comment.id, sort)
+                if comment.id in reply_counts
+                else None,
+            )
+            for comment in page
+        ]
+
+        next_cursor = None
+        if has_next_page:
+            last_comment = page[-1]
+            last_key = (
+                last_comment.votes
+                if sort == "top"
+                else last_comment.created_on.isoformat()
+            )
+            next_cursor = encode_cursor(parent_id, sort, last_key, last_comment.id)
+
+        return AllCommentsViewSchema(comments=all_comments, next_cursor=next_cursor)
+
+    @staticmethod
+    def decode_page_cursor(cursor: str) -> tuple[int | None, str, tuple | None]:
+        """Decodes a next_cursor or replies_cursor issued by get_comments_page
+
+        Args:
+            cursor (str): The opaque cursor
+
+        Raises:
+            ValueError: If the cursor is malformed
+
+        Returns:
+            tuple[int | None, str, tuple | None]: The parent Id, sort, and the sort key
+                and Id to continue after
+        """
+        parent_id, sort, *after = decode_cursor(cursor)
+
+        if sort not in COMMENT_SORTS or len(after) not in (0, 2):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        if parent_id is not None:
+            parent_id = int(parent_id)
+        if after:
+            last_key, last_id = after
+            last_key = int(last_key) if sort == "top" else pendulum.parse(last_key)
+            after = (last_key, int(last_id))
+
+        return parent_id, sort, after or None
+
+    @property
+    def depth(self) -> int:
+        """Nesting level of this comment; top-level comments are at depth 1"""
+        return self.path.count("/")
+
+    def get_ancestors(self, levels: int | None = None) -> list["Comments"]:
+        """Returns the comments this one replies to, from the outermost down
+
+        Args:
+            levels (int | None, optional): How many levels up to go; None goes up to
+                the top-level comment. Defaults to None.
+
+        Returns:
+            list[Comments]: The ancestor comments
+        """
+        ancestor_ids = [int(comment_id) for comment_id in self.path.split("/")[:-2]]
+        if levels is not None:
+            ancestor_ids = ancestor_ids[max(len(ancestor_ids) - levels, 0) :]
+
+        if not ancestor_ids:
+            return []
+
+        ancestors = (
+            Comments.query.options(joinedload(Comments.user))
+            .filter(Comments.id.in_(ancestor_ids))
+            .all()
+        )
+        return sorted(ancestors, key=lambda ancestor: ancestor.path)
+
+    def get_subtree(self, max_depth: int) -> CommentTreeViewSchema:
+        """Returns this comment and its nested replies, loaded with one range query
+
+        Args:
+            max_depth (int): Levels to load; 1 loads this comment only
+
+        Returns:
+            CommentTreeViewSchema: This comment with its nested replies
+        """
+        depth = func.length(Comments.path) - func.length(
+            func.replace(Comments.path, "/", "")
+        )
+
+        rows = db.session.execute(
+            select(
+                Comments.id,
+                Comments.comment,
+                Comments.votes,
+                Comments.created_on,
+                Comments.post_id,
+                Comments.parent_id,
+                Comments.user_id,
+                User.username,
+            )
+            .join(User, User.id == Comments.user_id)
+            .where(
+                Comments.path.startswith(self.path, autoescape=True),
+                depth < self.depth + max_depth,
+            )
+            .order_by(Comments.path)
+        ).all()
+
+        return CommentTreeViewSchema(**assemble_comment_tree(rows)[0])
+
+    @classmethod
+    def get_comment_tree(
+        cls, post_id: int, max_depth: int, top_n_children: int
+    ) -> CommentThreadViewSchema:
+        """Returns a post's comments as a nested thread, loaded with one recursive query
+
+        Args:
+            post_id (int): The Post Id
+            max_depth (int): Levels of replies to load; 1 loads top-level comments only
+            top_n_children (int): Highest voted replies to keep under each comment
+
+        Returns:
+            CommentThreadViewSchema: The top-level comments with their nested replies
+        """
+        # Rank siblings once up front; window functions can't run in the recursive term
+        ranked = (
+            select(
+                cls.id,
+                cls.comment,
+                cls.votes,
+                cls.created_on,
+                cls.post_id,
+                cls.parent_id,
+                cls.user_id,
+                func.row_number()
+                .over(partition_by=cls.parent_id, order_by=(cls.votes.desc(), cls.id))
+                .label("sibling_rank"),
+            )
+            .where(cls.post_id == post_id)
+            .cte("ranked")
+        )
+
+        tree = (
+            select(*ranked.c, literal(1).label("depth"))
+            .where(
+                ranked.c.parent_id.is_(None), ranked.c.sibling_rank <= top_n_children
+            )
+            .cte("tree", recursive=True)
+        )
+        tree = tree.union_all(
+            select(*ranked.c, (tree.c.depth + 1).label("depth"))
+            .join(tree, ranked.c.parent_id == tree.c.id)
+            .where(tree.c.depth < max_depth, ranked.c.sibling_rank <= top_n_children)
+        )
+
+        rows = db.session.execute(
+            select(tree, User.username)
+            .join(User, User.id == tree.c.user_id)
+            .order_by(tree.c.depth, tree.c.sibling_rank)
+        ).all()
+
+        return CommentThreadViewSchema(comments=assemble_comment_tree(rows))
+
+    @memoize_by_id("COMMENT_PARENT")
     def get_parent_comment(self) -> CommentViewSchema | None:
         """Returns the parent comment of a reply comment
 
@@ -64,7 +355,7 @@ class Comments(db.Model, CRUDMixin):
 
         return None
 
-    @cache.memoize(timeout=configs.CACHE_DEFAULT_TIMEOUT)
+    @memoize_by_id("COMMENT_REPLIES")
     def get_direct_comment_replies(self) -> AllCommentsViewSchema:
         """Returns all children comments of this comment
 
@@ -87,3 +378,62 @@ class Comments(db.Model, CRUDMixin):
             )
 
         return AllCommentsViewSchema(comments=all_comments)
+
+
+def assemble_comment_tree(rows: list) -> list[dict]:
+    """Nests comment rows under their parents in a single pass
+
+    Rows must be ordered so that every parent precedes its replies; replies keep
+    the order in which they appear.
+
+    Args:
+        rows (list): Rows with comment columns and the commenter's username
+
+    Returns:
+        list[dict]: The root comments, each with a list of nested replies
+    """
+    nodes: dict[int, dict] = {}
+    roots: list[dict] = []
+
+    for row in rows:
+        node = {
+            "id": row.id,
+            "comment": row.comment,
+            "votes": row.votes,
+            "created_on": row.created_on,
+            "user": {"id": row.user_id, "username": row.username},
+            "post_id": row.post_id,
+            "parent_id": row.parent_id,
+            "replies": [],
+        }
+        nodes[row.id] = node
+
+        parent = nodes.get(row.parent_id)
+        if parent is not None:
+            parent["replies"].append(node)
+        else:
+            roots.append(node)
+
+    return roots
+
+
+@event.listens_for(Comments, "after_insert")
+def set_comment_path(mapper, connection, target: Comments) -> None:
+    """Extends the parent's path with the Id of a newly inserted comment"""
+    parent = aliased(Comments)
+    parent_path = (
+        select(parent.path).where(parent.id == target.parent_id).scalar_subquery()
+    )
+
+    path = connection.execute(
+        update(Comments)
+        .where(Comments.id == target.id)
+        .values(
+            path=func.coalesce(parent_path, "")
+            + cast(Comments.id, db.String)
+            + "/"
+        )
+        .returning(Comments.path)
+    ).scalar_one()
+
+    set_committed_value(target, "path", path)
@@ -1,4 +1,20 @@
+import datetime
+import math
+
 import pendulum
+from sqlalchemy import (
+    case,
+    cast,
+    column,
+    event,
+    extract,
+    func,
+    or_,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.sql.elements import ColumnElement
 
 from ...configs import configs
 from ..controllers.schemas import (
@@ -10,6 +26,13 @@ from ..database import db
 from ..extensions import cache
 from . import CRUDMixin
 
+# Reference point for hot scores; keeps the time component small enough for a float
+HOT_SCORE_EPOCH: int = 1134028003
+# Seconds of age worth one order of magnitude of votes in the hot ranking
+HOT_SCORE_DECAY: int = 45000
+
+FEED_SORTS: tuple[str, ...] = ("hot", "top", "new", "controversial")
+
 
 class Post(db.Model, CRUDMixin):
     """Represents a Post
@@ -23,9 +46,28 @@ class Post(db.Model, CRUDMixin):
     """
 
     __tablename__ = "post"
+    __table_args__ = (
+        db.Index("ix_post_created_on_id", "created_on", "id"),
+        db.Index("ix_post_hot_score_id", "hot_score", "id"),
+        db.Index("ix_post_belongs_to_hot_score", "belongs_to", "hot_score", "id"),
+        db.Index("ix_post_belongs_to_votes", "belongs_to", "votes", "id"),
+        db.Index("ix_post_belongs_to_created_on", "belongs_to", "created_on", "id"),
+        db.Index(
+            "ix_post_belongs_to_controversy_score",
+            "belongs_to",
+            "controversy_score",
+            "id",
+        ),
+        {"extend_existing": True},
+    )
+
     title = db.Column(db.String(200), nullable=False, unique=False)
     text = db.Column(db.String(1000), nullable=True, unique=False)
     votes = db.Column(db.Integer, nullable=False, default=1)
+    upvotes = db.Column(db.Integer, nullable=False, default=0)
+    downvotes = db.Column(db.Integer, nullable=False, default=0)
+    hot_score = db.Column(db.Float, nullable=False, default=0.0)
+    controversy_score = db.Column(db.Float, nullable=False, default=0.0)
     created_on = db.Column(
         db.DateTime(timezone=True), default=pendulum.now, nullable=False
     )
@@ -44,6 +86,95 @@ class Post(db.Model, CRUDMixin):
     def __repr__(self) -> str:
         return f"<Post: {self.title}>"
 
+    @classmethod
+    def feed_ordering(cls, sort: str) -> tuple:
+        """Returns the ORDER BY clauses of a ranked feed
+
+        Each ordering is backed by a (belongs_to, <score>, id) index so the top N posts
+        of a subreddit are read with an index scan.
+
+        Args:
+            sort (str): One of FEED_SORTS
+
+        Returns:
+            tuple: The ORDER BY clauses
+        """
+        return {
+            "hot": (cls.hot_score.desc(), cls.id.desc()),
+            "top": (cls.votes.desc(), cls.id.desc()),
+            "new": (cls.created_on.desc(), cls.id.desc()),
+            "controversial": (cls.controversy_score.desc(), cls.id.desc()),
+        }[sort]
+
+    @classmethod
+    def hottest_ids(cls, limit: int) -> list[int]:
+        """Returns the ids of the hottest posts across all subreddits
+
+        Args:
+            limit (int): Number of posts
+
+        Returns:
+            list[int]: Post ids, hottest first
+        """
+        return (
+            db.session.execute(
+                select(cls.id).order_by(*cls.feed_ordering("hot")).limit(limit)
+            )
+            .scalars()
+            .all()
+        )
+
+    @classmethod
+    def bulk_apply_votes(cls, deltas: dict[int, dict[str, int]]) -> list:
+        """Adds buffered vote deltas to many posts in one UPDATE and refreshes their scores
+
+        Args:
+            deltas (dict[int, dict[str, int]]): Post Id to its votes, upvotes and downvotes deltas
+
+        Returns:
+            list: (id, belongs_to, created_by) rows of the updated posts
+        """
+        rows = values(
+            column("id", db.Integer),
+            column("votes", db.Integer),
+            column("upvotes", db.Integer),
+            column("downvotes", db.Integer),
+            name="vote_deltas",
+        ).data(
+            [
+                (
+                    post_id,
+                    delta.get("votes", 0),
+                    delta.get("upvotes", 0),
+                    delta.get("downvotes", 0),
+                )
+                for post_id, delta in deltas.items()
+            ]
+        )
+
+        votes = cls.votes + rows.c.votes
+        upvotes = cls.upvotes + rows.c.upvotes
+        downvotes = cls.downvotes + rows.c.downvotes
+
+        statement = (
+            update(cls)
+            .where(cls.id == rows.c.id)
+            .values(
+                {
+                    cls.votes: votes,
+                    cls.upvotes: upvotes,
+                    cls.downvotes: downvotes,
+                    cls.hot_score: hot_score_expression(votes, cls.created_on),
+                    cls.controversy_score: controversy_score_expression(
+                        upvotes, downvotes
+                    ),
+                }
+            )
+            .returning(cls.id, cls.belongs_to, cls.created_by)
+            .execution_options(synchronize_session=False)
+        )
+        return db.session.execute(statement).all()
+
     def get_all_post_comments(self) -> AllCommentsViewSchema:
         """Returns all Comments in this Post
 
@@ -65,3 +196,89 @@ class Post(db.Model, CRUDMixin):
             )
 
         return AllCommentsViewSchema(comments=all_comments)
+
+
+def hot_score(votes: int, created_on: datetime.datetime) -> float:
+    """Computes the hot ranking score of a post
+
+    Args:
+        votes (int): Net votes of the post
+        created_on (datetime.datetime): When the post was created
+
+    Returns:
+        float: The hot score; newer and higher voted posts score higher
+    """
+    order = math.log10(max(abs(votes), 1))
+    sign = (votes > 0) - (votes < 0)
+    seconds = created_on.timestamp() - HOT_SCORE_EPOCH
+    return sign * order + seconds / HOT_SCORE_DECAY
+
+
+def controversy_score(upvotes: int, downvotes: int) -> float:
+    """Computes the controversy ranking score of a post
+
+    Args:
+        upvotes (int): Up-votes received
+        downvotes (int): Down-votes received
+
+    Returns:
+        float: The controversy score; many, evenly split votes score higher
+    """
+    if upvotes <= 0 or downvotes <= 0:
+        return 0.0
+
+    balance = downvotes / upvotes if upvotes > downvotes else upvotes / downvotes
+    return float((upvotes + downvotes) ** balance)
+
+
+def hot_score_expression(
+    votes: ColumnElement, created_on: ColumnElement
+) -> ColumnElement:
+    """SQL counterpart of hot_score, for use in UPDATE statements
+
+    Args:
+        votes (ColumnElement): Net votes expression
+        created_on (ColumnElement): Creation timestamp expression
+
+    Returns:
+        ColumnElement: The hot score expression
+    """
+    order = func.log(cast(func.greatest(func.abs(votes), 1), db.Float))
+    seconds = extract("epoch", created_on) - HOT_SCORE_EPOCH
+    return func.sign(votes) * order + seconds / HOT_SCORE_DECAY
+
+
+def controversy_score_expression(
+    upvotes: ColumnElement, downvotes: ColumnElement
+) -> ColumnElement:
+    """SQL counterpart of controversy_score, for use in UPDATE statements
+
+    Args:
+        upvotes (ColumnElement): Up-votes expression
+        downvotes (ColumnElement): Down-votes expression
+
+    Returns:
+        ColumnElement: The controversy score expression
+    """
+    balance = case(
+        (upvotes > downvotes, cast(downvotes, db.Float) / upvotes),
+        else_=cast(upvotes, db.Float) / downvotes,
+    )
+    return case(
+        (or_(upvotes <= 0, downvotes <= 0), 0.0),
+        else_=func.power(upvotes + downvotes, balance),
+    )
+
+
+@event.listens_for(Post, "before_insert")
+def set_initial_scores(mapper, connection, target: Post) -> None:
+    """Scores a new post before it is inserted"""
+    if target.created_on is None:
+        target.created_on = pendulum.now()
+    if target.votes is None:
+        target.votes = 1
+
+    target.hot_score = hot_score(target.votes, target.created_on)
+    target.controversy_score = controversy_score(
+        target.upvotes or 0, target.downvotes or 0
+    )
@@ -1,9 +1,10 @@
 import pendulum
+from sqlalchemy import func, select
 
 from ...configs import configs
 from ..controllers.schemas import AllUsersViewSchema, UserViewSchema
 from ..database import db
-from ..extensions import cache
+from ..utils import memoize_by_id
 from . import CRUDMixin
 from .usersubreddit import user_subreddit_junction_table
 
@@ -35,7 +36,30 @@ class Subreddit(db.Model, CRUDMixin):
     def __repr__(self) -> str:
         return f"<Subreddit: {self.name}>"
 
-    @cache.memoize(timeout=configs.CACHE_DEFAULT_TIMEOUT)
+    @classmethod
+    def largest_ids(cls, limit: int) -> list[int]:
+        """Returns the ids of the subreddits with the most members
+
+        Args:
+            limit (int): Number of subreddits
+
+        Returns:
+            list[int]: Subreddit ids, largest first
+        """
+        members = func.count(user_subreddit_junction_table.c.user_id)
+        return (
+            db.session.execute(
+                select(cls.id)
+                .outerjoin(user_subreddit_junction_table)
+                .group_by(cls.id)
+                .order_by(members.desc(), cls.id)
+                .limit(limit)
+            )
+            .scalars()
+            .all()
+        )
+
+    @memoize_by_id("SUBREDDIT_MEMBERS")
     def get_members(self) -> AllUsersViewSchema:
         """Returns all Members in a Subreddit
 
@@ -1,11 +1,20 @@
 import uuid
 
 import pendulum
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
 
 from ...configs import configs
-from ..controllers.schemas import SubredditViewSchema
+from ..controllers.schemas import SubredditViewSchema, UserSnapshotSchema
 from ..database import db
-from ..extensions import bcrypt, cache
+from ..extensions import bcrypt
+from ..utils import (
+    CACHE_KEYS_REFERENCE,
+    cache_getter,
+    cache_invalidator,
+    cache_setter,
+    memoize_by_id,
+)
 from . import CRUDMixin
 from .usersubreddit import user_subreddit_junction_table
 
@@ -44,7 +53,35 @@ class User(db.Model, CRUDMixin):
     def __repr__(self) -> str:
         return f"<User {self.username}>"
 
-    @cache.memoize(timeout=configs.CACHE_DEFAULT_TIMEOUT)
+    @classmethod
+    def get_snapshot(cls, username: str) -> UserSnapshotSchema | None:
+        """Returns the identity of a signed in user, cached per worker and in Redis
+
+        Authenticated requests resolve their user through this, so most of them skip
+        the user query.
+
+        Args:
+            username (str): The username from the access token
+
+        Returns:
+            UserSnapshotSchema | None: The user's id, username and admin flag, None if
+                no such user exists
+        """
+        cache_key = CACHE_KEYS_REFERENCE["USER_IDENTITY"](username)
+        snapshot = cache_getter(cache_key)
+
+        if snapshot is None:
+            user = cls.query.filter_by(username=username).one_or_none()
+
+            if user is None:
+                return None
+
+            snapshot = UserSnapshotSchema.from_orm(user)
+            cache_setter(cache_key, snapshot, timeout=configs.USER_IDENTITY_TIMEOUT)
+
+        return snapshot
+
+    @memoize_by_id("JOINED_SUBREDDITS")
     def get_joined_sureddits(self) -> list[SubredditViewSchema]:
         """Returns all subreddits a User is a member of
 
@@ -68,6 +105,41 @@ class User(db.Model, CRUDMixin):
         return joined_subs
 
 
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def collect_changed_identity(mapper, connection, target: User) -> None:
+    """Notes the usernames of a changed or deleted user, for invalidation on commit"""
+    usernames = {target.username}
+
+    # A renamed user is also cached under the old username
+    history = inspect(target).attrs.username.history
+    usernames.update(history.deleted or ())
+
+    session = object_session(target)
+    session.info.setdefault("changed_identities", set()).update(usernames)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_identities(session: Session) -> None:
+    """Drops the cached identities of users changed by a committed transaction
+
+    Dropping them any earlier would let a concurrent request cache the old row again
+    before the change is visible.
+    """
+    usernames = session.info.pop("changed_identities", None)
+
+    if usernames:
+        cache_invalidator(
+            [CACHE_KEYS_REFERENCE["USER_IDENTITY"](username) for username in usernames]
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_identities(session: Session) -> None:
+    """Forgets the identities noted by a rolled back transaction"""
+    session.info.pop("changed_identities", None)
+
+
 def hash_password(password: str) -> str:
     """Hashes the password
 
@@ -0,0 +1,108 @@
+import pendulum
+from sqlalchemy import Table, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from ..database import db
+
+post_votes_table = db.Table(
+    "post_votes",
+    db.Column("user_id", db.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    db.Column("post_id", db.ForeignKey("post.id", ondelete="CASCADE"), primary_key=True),
+    db.Column("value", db.SmallInteger, nullable=False),
+    db.Column("voted_on", db.DateTime(timezone=True), default=pendulum.now, nullable=False),
+)
+
+comment_votes_table = db.Table(
+    "comment_votes",
+    db.Column("user_id", db.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    db.Column(
+        "comment_id", db.ForeignKey("comments.id", ondelete="CASCADE"), primary_key=True
+    ),
+    db.Column("value", db.SmallInteger, nullable=False),
+    db.Column("voted_on", db.DateTime(timezone=True), default=pendulum.now, nullable=False),
+)
+
+vote_flushes_table = db.Table(
+    "vote_flushes",
+    db.Column("batch_id", db.String(36), primary_key=True),
+    db.Column(
+        "flushed_on", db.DateTime(timezone=True), default=pendulum.now, nullable=False
+    ),
+)
+
+
+def claim_vote_batch(batch_id: str) -> bool:
+    """Records a batch of buffered votes as applied, within the applying transaction
+
+    A concurrent claim of the same batch waits for this transaction to finish and
+    then finds the batch claimed. Claims older than a week are pruned.
+
+    Args:
+        batch_id (str): Id of the batch
+
+    Returns:
+        bool: False when the batch was already applied
+    """
+    db.session.execute(
+        delete(vote_flushes_table).where(
+            vote_flushes_table.c.flushed_on < pendulum.now().subtract(weeks=1)
+        )
+    )
+    statement = (
+        insert(vote_flushes_table)
+        .values(batch_id=batch_id, flushed_on=pendulum.now())
+        .on_conflict_do_nothing()
+        .returning(vote_flushes_table.c.batch_id)
+    )
+    return db.session.execute(statement).first() is not None
+
+
+def upsert_vote(
+    table: Table, item_column: str, user_id: int, item_id: int, value: int
+) -> int:
+    """Records a user's vote in a ledger with a single upsert
+
+    Args:
+        table (Table): post_votes_table or comment_votes_table
+        item_column (str): Name of the voted item's key column, e.g. "post_id"
+        user_id (int): Id of the voting user
+        item_id (int): Id of the voted post or comment
+        value (int): 1 for an up-vote, -1 for a down-vote
+
+    Returns:
+        int: Net change to the item's votes; 0 when the user already voted this way
+    """
+    key = (table.c.user_id == user_id) & (table.c[item_column] == item_id)
+    previous_value = select(table.c.value).where(key).scalar_subquery()
+
+    statement = insert(table).values(
+        {
+            "user_id": user_id,
+            item_column: item_id,
+            "value": value,
+            "voted_on": pendulum.now(),
+        }
+    )
+    upserted = (
+        statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c[item_column]],
+            set_={
+                "value": statement.excluded.value,
+                "voted_on": statement.excluded.voted_on,
+            },
+            where=table.c.value != statement.excluded.value,
+        )
+        .returning(table.c.value)
+        .cte("upserted")
+    )
+
+    # All parts of one statement share a snapshot, so previous_value predates the
+    # upsert; no row returned by the upsert means nothing changed
+    net_change = select(
+        func.coalesce(
+            select(upserted.c.value).scalar_subquery()
+            - func.coalesce(previous_value, 0),
+            0,
+        )
+    )
+    return db.session.execute(net_change).scalar_one()
@@ -0,0 +1,84 @@
+import json
+import time
+from logging import getLogger
+from threading import Thread
+from typing import Any, Callable, Final
+
+from redis.client import PubSub
+
+from .extensions import redis_client
+
+logger = getLogger("default")
+
+# Handlers of the Redis pub/sub channels every worker listens on, keyed by channel
+PUBSUB_HANDLERS: Final[dict[str, Callable[[Any], None]]] = {}
+
+# Called when the listener loses its connection and may have missed messages
+PUBSUB_RESET_HANDLERS: Final[list[Callable[[], None]]] = []
+
+
+def subscribe(channel: str, on_reset: Callable[[], None] | None = None) -> Callable:
+    """Registers a handler for the JSON messages published on a channel
+
+    Args:
+        channel (str): The Redis channel
+        on_reset (Callable[[], None] | None, optional): Drops whatever state the
+            handler keeps in sync, for when messages may have been missed. Defaults to None.
+
+    Returns:
+        Callable: The decorator
+    """
+
+    def decorator(handler: Callable[[Any], None]) -> Callable[[Any], None]:
+        PUBSUB_HANDLERS[channel] = handler
+        if on_reset:
+            PUBSUB_RESET_HANDLERS.append(on_reset)
+        return handler
+
+    return decorator
+
+
+def publish(channel: str, message: Any) -> int:
+    """Publishes a JSON message to every worker
+
+    Args:
+        channel (str): The Redis channel
+        message (Any): JSON serialisable payload
+
+    Returns:
+        int: Number of listeners that received the message
+    """
+    return redis_client.publish(channel, json.dumps(message))
+
+
+def _dispatch(message: dict) -> None:
+    """Hands a received message to its channel's handler"""
+    PUBSUB_HANDLERS[message["channel"]](json.loads(message["data"]))
+
+
+def _on_listener_error(error: Exception, pubsub: PubSub, thread: Thread) -> None:
+    """Keeps the listener alive across Redis disconnections"""
+    logger.warning("Pub/sub listener error, resetting synced state: %s", error)
+
+    for on_reset in PUBSUB_RESET_HANDLERS:
+        on_reset()
+
+    # The next read reconnects and resubscribes
+    time.sleep(1)
+
+
+def start_listener() -> Thread | None:
+    """Starts a daemon thread dispatching the subscribed channels of this worker
+
+    Returns:
+        Thread | None: The listener thread, None when nothing is subscribed
+    """
+    if not PUBSUB_HANDLERS:
+        return None
+
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{channel: _dispatch for channel in PUBSUB_HANDLERS})
+
+    return pubsub.run_in_thread(
+        sleep_time=1, daemon=True, exception_handler=_on_listener_error
+    )
@@ -0,0 +1,116 @@
+import functools
+import hashlib
+import json
+from http import HTTPStatus
+from typing import Callable, Final
+
+from flask import Response, current_app, jsonify, make_response, request
+
+from ..configs import configs
+from .votes import overlay_pending_votes, pending_votes, voted_item_ids
+
+# Cache-Control policies of the read endpoints. Clients revalidate with the ETag
+CACHE_CONTROL_POLICIES: Final[dict[str, str]] = {
+    "PUBLIC": f"public, max-age={configs.HTTP_CACHE_MAX_AGE}, must-revalidate",
+    "PRIVATE": "private, no-cache",
+}
+
+
+def body_etag(body: bytes) -> str:
+    """Returns the strong ETag of a response body
+
+    Args:
+        body (bytes): The encoded body
+
+    Returns:
+        str: The unquoted ETag
+    """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def cacheable_response(
+    payload: dict, status: int = HTTPStatus.OK, kind: str | None = "post"
+) -> dict:
+    """Encodes a response payload once, so cache hits can serve the bytes as they are
+
+    Args:
+        payload (dict): The serialised response
+        status (int, optional): The Status Code. Defaults to HTTPStatus.OK.
+        kind (str | None, optional): What the payload root is. Defaults to "post".
+
+    Returns:
+        dict: The JSON body, its ETag, status code and ids of the voted items it shows
+    """
+    body = current_app.json.dumps(payload).encode("utf-8")
+    return {
+        "body": body,
+        "etag": body_etag(body),
+        "status": int(status),
+        "kind": kind,
+        "vote_refs": voted_item_ids(payload, kind),
+    }
+
+
+def cached_response(entry: dict) -> tuple[Response, int]:
+    """Serves a cacheable_response entry, or 304 when the client's copy is current
+
+    The ETag is checked against If-None-Match before any body is prepared. The stored
+    body is sent untouched unless unflushed votes change a count it shows, in which
+    case it is decoded and overlaid.
+
+    Args:
+        entry (dict): The cacheable_response entry
+
+    Returns:
+        tuple[Response, int]: Response Object and Status Code
+    """
+    pending = {
+        kind: pending_votes(kind, item_ids)
+        for kind, item_ids in entry["vote_refs"].items()
+    }
+    etag = entry.get("etag") or body_etag(entry["body"])
+
+    if any(pending.values()):
+        # The overlaid body differs from the stored one, and so must its ETag
+        etag = body_etag(f"{etag}:{sorted(pending.items())}".encode("utf-8"))
+
+    if entry["status"] == HTTPStatus.OK and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=HTTPStatus.NOT_MODIFIED)
+        response.set_etag(etag)
+        return response, HTTPStatus.NOT_MODIFIED
+
+    if any(pending.values()):
+        payload = json.loads(entry["body"])
+        response = jsonify(overlay_pending_votes(payload, entry["kind"], pending))
+    else:
+        response = current_app.response_class(
+            entry["body"], mimetype="application/json"
+        )
+
+    response.set_etag(etag)
+    return response, entry["status"]
+
+
+def cache_control(policy: str) -> Callable:
+    """Sets a view's Cache-Control policy on its successful responses
+
+    Args:
+        policy (str): One of CACHE_CONTROL_POLICIES
+
+    Returns:
+        Callable: The decorator
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs) -> Response:
+            response = make_response(view(*args, **kwargs))
+
+            if response.status_code in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+                response.headers["Cache-Control"] = policy
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,79 @@
+import time
+from threading import Lock
+
+
+class RevocationFilter:
+    """A per worker copy of the revoked token ids, clearing most tokens without Redis
+
+    Ids arrive over pub/sub as tokens are revoked, and the whole set is synced every
+    interval in case a message was missed. A token missing from a synced, complete
+    filter is not revoked; one present is still confirmed against the blocklist.
+
+    Args:
+        interval (float): Seconds a sync is trusted for
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._revoked: dict[str, float] = {}
+        self._synced_at: float | None = None
+        self._complete_at = float("inf")
+        self._lock = Lock()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Adds a revoked token id
+
+        Args:
+            jti (str): The token's id
+            expires_at (float): Unix time its blocklist entry expires at
+        """
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def sync(self, revoked: dict[str, float], complete_at: float = 0.0) -> None:
+        """Merges in the full set of revoked token ids, dropping expired ones
+
+        Ids are merged rather than replaced, so those added while the set was being
+        read are kept.
+
+        Args:
+            revoked (dict[str, float]): Expiry, as Unix time, per revoked token id
+            complete_at (float, optional): Unix time from which the set holds every
+                revoked token still valid. Defaults to 0.0.
+        """
+        now = time.time()
+
+        with self._lock:
+            self._revoked.update(revoked)
+            self._revoked = {
+                jti: expires_at
+                for jti, expires_at in self._revoked.items()
+                if expires_at > now
+            }
+            self._synced_at = time.monotonic()
+            self._complete_at = complete_at
+
+    def is_stale(self) -> bool:
+        """Whether the filter needs syncing before it can be trusted
+
+        Returns:
+            bool: True when never synced, marked stale, or the interval has elapsed
+        """
+        synced_at = self._synced_at
+        return synced_at is None or time.monotonic() - synced_at >= self.interval
+
+    def is_complete(self) -> bool:
+        """Whether a token missing from the filter can be taken as not revoked
+
+        Returns:
+            bool: False until the set holds every revoked token still valid
+        """
+        return time.time() >= self._complete_at
+
+    def mark_stale(self) -> None:
+        """Distrusts the filter until its next sync, e.g. when messages were missed"""
+        self._synced_at = None
+
+    def __contains__(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
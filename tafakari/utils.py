@@ -1,10 +1,34 @@
-from logging import Logger, getLogger
+import atexit
+import base64
+import binascii
+import functools
+import inspect
+import json
+import math
+import pickle
+import random
+import re
+import time
+import zlib
+from collections import defaultdict
+from logging import Formatter, Logger, LogRecord, getLogger
 from logging.config import dictConfig
-from typing import Any, Callable, Final
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from threading import Lock
+from typing import Any, Callable, Final, Iterable
 
-from flask import Flask, Request
+from flask import Flask, Request, g, has_request_context
+from redis.exceptions import LockError
 
-from .extensions import cache
+from .extensions import (
+    cache,
+    cache_metrics,
+    local_cache,
+    redis_client,
+    request_metrics,
+)
+from .pubsub import publish, subscribe
 from ..configs import configs
 
 
@@ -27,22 +51,103 @@ def get_client_ip_address(client_request: Request) -> str | None:
     return ip_address
 
 
-def configure_logger(log_path: str, name: str = "default") -> Logger:
+class BoundedQueueHandler(QueueHandler):
+    """Hands log records to a bounded queue, for a QueueListener to write elsewhere
+
+    When the queue is full, records are either dropped and counted, or the logging
+    thread blocks until the listener catches up.
+
+    Args:
+        log_queue (Queue): The bounded queue
+        policy (str): Either "drop" or "block"
+    """
+
+    def __init__(self, log_queue: Queue, policy: str) -> None:
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+        self._dropped_lock = Lock()
+
+    def enqueue(self, record: LogRecord) -> None:
+        """Queues a record according to the full queue policy
+
+        Args:
+            record (LogRecord): The prepared record
+        """
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            request_metrics.increment("log_records_dropped_total")
+
+
+class AccessLogFormatter(Formatter):
+    """Formats access log records as one JSON object per line, others as usual"""
+
+    def format(self, record: LogRecord) -> str:
+        """Formats a record
+
+        Args:
+            record (LogRecord): The record, with an "access" dict for access logs
+
+        Returns:
+            str: The formatted line
+        """
+        access = getattr(record, "access", None)
+
+        if access is None:
+            return super().format(record)
+
+        return json.dumps(
+            {"time": self.formatTime(record, self.datefmt), **access}, default=str
+        )
+
+
+# Writes queued log records on a background thread, when queueing is enabled
+_log_listener: QueueListener | None = None
+
+
+def configure_logger(
+    log_path: str,
+    name: str = "default",
+    queue_size: int = configs.LOG_QUEUE_SIZE,
+    queue_policy: str = configs.LOG_QUEUE_POLICY,
+) -> Logger:
     """Configures the Application's Logger
 
+    With a queue size, logging only queues records and a background thread writes
+    them to stdout and the log file, keeping disk I/O off the request thread.
+
     Args:
         log_path (str): The system file path to write logs to
         name (str, optional): Name of the Logger. Defaults to "default".
+        queue_size (int, optional): Records the queue holds, 0 to write them on the
+            logging thread. Defaults to configs.LOG_QUEUE_SIZE.
+        queue_policy (str, optional): "drop" or "block" when the queue is full.
+            Defaults to configs.LOG_QUEUE_POLICY.
 
     Returns:
         Logger: The Application's Logger
     """
+    global _log_listener
+
+    if _log_listener:
+        # Writes out what the previous configuration queued
+        _log_listener.stop()
+        _log_listener = None
+
     dictConfig(
         {
             "version": 1,
             "formatters": {
                 "default": {
-                    "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                    "()": AccessLogFormatter,
+                    "fmt": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
                     "datefmt": "%Y-%m-%d %H:%M:%S",
                 }
             },
@@ -66,7 +171,26 @@ def configure_logger(log_path: str, name: str = "default") -> Logger:
             "disable_existing_loggers": False,
         }
     )
-    return getLogger(name)
+    logger = getLogger(name)
+
+    if queue_size:
+        writers = list(logger.handlers)
+        for writer in writers:
+            logger.removeHandler(writer)
+
+        log_queue: Queue = Queue(maxsize=queue_size)
+        logger.addHandler(BoundedQueueHandler(log_queue, policy=queue_policy))
+        _log_listener = QueueListener(log_queue, *writers, respect_handler_level=True)
+        _log_listener.start()
+
+    return logger
+
+
+@atexit.register
+def _stop_log_listener() -> None:
+    """Writes out the queued records before the worker exits"""
+    if _log_listener:
+        _log_listener.stop()
 
 
 def get_logger_instance(current_app: Flask) -> Logger:
@@ -86,13 +210,210 @@ def get_logger_instance(current_app: Flask) -> Logger:
 
 CACHE_KEYS_REFERENCE: Final[dict[str, str | Callable]] = {
     "PROFILE": lambda username: f"{username}_profile",
+    "USER_IDENTITY": lambda username: f"user_identity_{username}",
     "ALL_SUBREDDITS": "all_subs",
     "SUBREDDIT_ID": lambda subreddit_id: f"subreddit_{subreddit_id}",
-    "ALL_POSTS": "all_posts",
-    "POST_ID": lambda post_id: f"post_{post_id}",
-    "ALL_POSTS_IN_SUBREDDIT": lambda subreddit_id: f"all_posts_in_subreddit_{subreddit_id}",
+    "ALL_POSTS": lambda limit=configs.POSTS_PAGE_SIZE, cursor=None: f"all_posts_{limit}_{cursor or 'head'}",
+    "POST_ID": lambda post_id, comment_sort="top": f"post_{post_id}_{comment_sort}",
+    "ALL_POSTS_IN_SUBREDDIT": lambda subreddit_id, sort="hot", limit=configs.POSTS_PAGE_SIZE: f"all_posts_in_subreddit_{subreddit_id}_{sort}_{limit}",
+    "SUBREDDIT_MEMBERS": lambda subreddit_id: f"subreddit_members_{subreddit_id}",
+    "JOINED_SUBREDDITS": lambda user_id: f"joined_subreddits_{user_id}",
+    "COMMENT_PARENT": lambda comment_id: f"comment_parent_{comment_id}",
+    "COMMENT_REPLIES": lambda comment_id: f"comment_replies_{comment_id}",
+}
+
+# Values written by cache_setter are pickled once and stored behind this header and a
+# codec byte, so cache_getter can decode them whatever codec was picked
+CACHE_VALUE_HEADER: Final[bytes] = b"\x00tfk"
+
+# Codec byte to (encode, decode). Larger values get the slower, tighter zlib level
+CACHE_CODEC_RAW, CACHE_CODEC_ZLIB_FAST, CACHE_CODEC_ZLIB_BEST = 0, 1, 2
+CACHE_CODECS: Final[dict[int, tuple[Callable, Callable]]] = {
+    CACHE_CODEC_RAW: (bytes, bytes),
+    CACHE_CODEC_ZLIB_FAST: (lambda data: zlib.compress(data, 1), zlib.decompress),
+    CACHE_CODEC_ZLIB_BEST: (lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+
+# Redis hash of per key family read and write counts, sizes and Redis latencies, with
+# fields "<family>:<stat>"
+CACHE_STATS: Final[str] = "cache_stats"
+
+
+def _key_family_patterns() -> list[tuple[str, re.Pattern]]:
+    """Turns CACHE_KEYS_REFERENCE into key matchers, most specific first"""
+    placeholder = "\x00"
+    patterns = []
+
+    for family, reference in CACHE_KEYS_REFERENCE.items():
+        template = reference
+        if callable(reference):
+            arity = len(inspect.signature(reference).parameters)
+            template = reference(*[placeholder] * arity)
+
+        literals = template.split(placeholder)
+        pattern = re.compile("^" + ".+?".join(map(re.escape, literals)) + "$")
+        patterns.append((len("".join(literals)), family, pattern))
+
+    return [(family, pattern) for _, family, pattern in sorted(patterns, reverse=True)]
+
+
+CACHE_KEY_FAMILIES: Final[list[tuple[str, re.Pattern]]] = _key_family_patterns()
+
+
+@functools.lru_cache(maxsize=4096)
+def cache_key_family(cache_key: str) -> str:
+    """Returns the CACHE_KEYS_REFERENCE family a cache key was built from
+
+    Args:
+        cache_key (str): The Cache Key, optionally versioned by generational_key
+
+    Returns:
+        str: The family, "OTHER" for keys built elsewhere
+    """
+    cache_key = re.sub(r"@[\d.]+$", "", cache_key)
+
+    for family, pattern in CACHE_KEY_FAMILIES:
+        if pattern.match(cache_key):
+            return family
+
+    return "OTHER"
+
+
+def encode_cache_value(value: Any, compress: bool = True) -> tuple[bytes, int]:
+    """Pickles a value, compressing it when it is large enough to pay off
+
+    Args:
+        value (Any): The Value to cache
+        compress (bool, optional): Whether compression may be used. Defaults to True.
+
+    Returns:
+        tuple[bytes, int]: The header tagged value and its uncompressed size
+    """
+    pickled = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    codec = CACHE_CODEC_RAW
+
+    if compress and len(pickled) >= configs.CACHE_COMPRESSION_THRESHOLD:
+        codec = (
+            CACHE_CODEC_ZLIB_BEST
+            if len(pickled) >= configs.CACHE_COMPRESSION_LARGE
+            else CACHE_CODEC_ZLIB_FAST
+        )
+
+    payload = CACHE_CODECS[codec][0](pickled)
+
+    if len(payload) >= len(pickled):
+        codec, payload = CACHE_CODEC_RAW, pickled
+
+    return CACHE_VALUE_HEADER + bytes([codec]) + payload, len(pickled)
+
+
+def decode_cache_value(stored: Any) -> Any:
+    """Decodes a value written by encode_cache_value
+
+    Args:
+        stored (Any): The value read from Redis
+
+    Returns:
+        Any: The original value; values without the header are returned as they are
+    """
+    if not isinstance(stored, bytes) or not stored.startswith(CACHE_VALUE_HEADER):
+        return stored
+
+    codec = stored[len(CACHE_VALUE_HEADER)]
+    payload = stored[len(CACHE_VALUE_HEADER) + 1 :]
+    return pickle.loads(CACHE_CODECS[codec][1](payload))
+
+
+def get_cache_stats() -> dict[str, dict[str, int | float]]:
+    """Returns the hit ratio, Redis latency and compression savings of each key family
+
+    Counts are summed over every worker; this worker's pending reads are added first.
+
+    Returns:
+        dict[str, dict[str, int | float]]: Stats per family
+    """
+    pipeline = redis_client.pipeline(transaction=False)
+    _write_cache_metrics(pipeline)
+    pipeline.hgetall(CACHE_STATS)
+    *_, all_stats = pipeline.execute()
+
+    families: dict[str, dict[str, int | float]] = defaultdict(dict)
+
+    for field, value in all_stats.items():
+        family, stat = field.rsplit(":", 1)
+        families[family][stat] = int(value)
+
+    for stats in families.values():
+        for stat in (
+            "writes",
+            "raw_bytes",
+            "stored_bytes",
+            "set_us",
+            "local_hits",
+            "hits",
+            "misses",
+            "get_us",
+        ):
+            stats.setdefault(stat, 0)
+
+        reads = stats["local_hits"] + stats["hits"] + stats["misses"]
+        redis_reads = stats["hits"] + stats["misses"]
+
+        stats["bytes_saved"] = stats["raw_bytes"] - stats["stored_bytes"]
+        stats["ratio"] = (
+            stats["stored_bytes"] / stats["raw_bytes"] if stats["raw_bytes"] else 1.0
+        )
+        stats["hit_ratio"] = (
+            (stats["local_hits"] + stats["hits"]) / reads if reads else 0.0
+        )
+        stats["avg_get_ms"] = (
+            stats["get_us"] / redis_reads / 1000 if redis_reads else 0.0
+        )
+        stats["avg_set_ms"] = (
+            stats["set_us"] / stats["writes"] / 1000 if stats["writes"] else 0.0
+        )
+        stats["avg_stored_bytes"] = (
+            stats["stored_bytes"] / stats["writes"] if stats["writes"] else 0.0
+        )
+
+    return dict(families)
+
+
+def _write_cache_metrics(pipeline: Any) -> None:
+    """Queues this worker's pending read counters onto a pipeline to CACHE_STATS"""
+    for field, amount in cache_metrics.drain().items():
+        pipeline.hincrby(CACHE_STATS, field, amount)
+
+
+# Tags filing cached entries under the records they were built from, so a write can
+# drop every dependent entry with invalidate_tags instead of listing keys by hand
+CACHE_TAGS: Final[dict[str, str | Callable]] = {
+    "POST": lambda post_id: f"post:{post_id}",
+    "POST_COMMENTS": lambda post_id: f"post_comments:{post_id}",
+    "SUBREDDITS": "subreddits",
+    "SUBREDDIT": lambda subreddit_id: f"subreddit:{subreddit_id}",
+    "USER": lambda username: f"user:{username}",
 }
 
+# Generation counters of cache namespaces. Keys built with generational_key embed the
+# counters, so one bump_generation retires every key of the namespace at once
+CACHE_GENERATIONS: Final[dict[str, str | Callable]] = {
+    "POSTS": "gen:posts",
+    "SUBREDDIT": lambda subreddit_id: f"gen:subreddit:{subreddit_id}",
+}
+
+# Redis set holding the cache keys filed under a tag
+CACHE_TAG_SET: Final[Callable] = lambda tag: f"cache_tag:{tag}"
+
+# Pub/sub channel telling every worker which keys to drop from its local cache
+CACHE_INVALIDATIONS_CHANNEL: Final[str] = "cache_invalidations"
+
+# Redis lock held by the one worker recomputing a cache entry
+CACHE_LOCK: Final[Callable] = lambda cache_key: f"cache_lock:{cache_key}"
+
+# Stands in for a memoize_by_id result of None, which cache_getter reads as a miss
+MEMOIZED_NONE: Final[str] = "__memoized_none__"
+
 
 def cache_invalidator(cache_key: str | list | None = None) -> bool:
     """Invalidates a key from Cache
@@ -103,14 +424,76 @@ def cache_invalidator(cache_key: str | list | None = None) -> bool:
     Returns:
         bool: Returns True if successful, otherwise False
     """
+    cache_keys = cache_key if isinstance(cache_key, list) else [cache_key]
+    local_cache.delete(*cache_keys)
+    publish(CACHE_INVALIDATIONS_CHANNEL, cache_keys)
+
     if isinstance(cache_key, list):
         return cache.delete_many(*cache_key)
 
     return cache.delete(cache_key)
 
 
+@subscribe(CACHE_INVALIDATIONS_CHANNEL, on_reset=local_cache.clear)
+def drop_local_entries(cache_keys: list[str]) -> None:
+    """Drops keys invalidated by any worker from this worker's local cache
+
+    Args:
+        cache_keys (list[str]): The invalidated keys
+    """
+    local_cache.delete(*cache_keys)
+
+
+def cache_getter(cache_key: str) -> Any:
+    """Gets a key from the worker's local cache, falling back to Redis
+
+    Args:
+        cache_key (str): The Cache Key
+
+    Returns:
+        Any: The cached value, None on a miss
+    """
+    family = cache_key_family(cache_key)
+    value = local_cache.get(cache_key)
+
+    if value is not None:
+        cache_metrics.record(family, local_hits=1)
+        _tally_request_lookup(hit=True)
+    else:
+        started = time.perf_counter()
+        value = decode_cache_value(cache.get(cache_key))
+        cache_metrics.record(
+            family,
+            hits=int(value is not None),
+            misses=int(value is None),
+            get_us=int((time.perf_counter() - started) * 1_000_000),
+        )
+        _tally_request_lookup(hit=value is not None)
+
+        if value is not None:
+            local_cache.set(cache_key, value)
+
+    if cache_metrics.due():
+        pipeline = redis_client.pipeline(transaction=False)
+        _write_cache_metrics(pipeline)
+        pipeline.execute()
+
+    return value
+
+
+def _tally_request_lookup(hit: bool) -> None:
+    """Counts the current request's cache hits and misses for its access log record"""
+    if has_request_context():
+        g.cache_hits = g.get("cache_hits", 0) + hit
+        g.cache_misses = g.get("cache_misses", 0) + (not hit)
+
+
 def cache_setter(
-    cache_key: str, value: Any, timeout: int = configs.CACHE_DEFAULT_TIMEOUT
+    cache_key: str,
+    value: Any,
+    timeout: int = configs.CACHE_DEFAULT_TIMEOUT,
+    tags: Iterable[str] = (),
+    compress: bool = True,
 ) -> bool | None:
     """Sets a key in Cache
 
@@ -118,8 +501,378 @@ def cache_setter(
         cache_key (str): The Cache Key
         value (Any): The Value to set in Cache
         timeout (int, optional): The TTL in Seconds. Defaults to configs.CACHE_DEFAULT_TIMEOUT.
+        tags (Iterable[str], optional): CACHE_TAGS to file the key under. Defaults to ().
+        compress (bool, optional): Compress values over CACHE_COMPRESSION_THRESHOLD. Defaults to True.
 
     Returns:
         bool | None: Returns True if successful, otherwise False
     """
-    return cache.set(cache_key, value, timeout=timeout)
+    stored, raw_size = encode_cache_value(value, compress=compress)
+    started = time.perf_counter()
+    is_set = cache.set(cache_key, stored, timeout=timeout)
+    set_us = int((time.perf_counter() - started) * 1_000_000)
+    # A timeout of 0 never expires in Redis, but local copies always expire quickly
+    local_cache.set(
+        cache_key, value, timeout=min(timeout, local_cache.timeout) if timeout else None
+    )
+
+    pipeline = redis_client.pipeline(transaction=False)
+    family = cache_key_family(cache_key)
+    pipeline.hincrby(CACHE_STATS, f"{family}:writes", 1)
+    pipeline.hincrby(CACHE_STATS, f"{family}:raw_bytes", raw_size)
+    pipeline.hincrby(CACHE_STATS, f"{family}:stored_bytes", len(stored))
+    pipeline.hincrby(CACHE_STATS, f"{family}:set_us", set_us)
+    if stored[len(CACHE_VALUE_HEADER)] != CACHE_CODEC_RAW:
+        pipeline.hincrby(CACHE_STATS, f"{family}:compressed", 1)
+
+    for tag in set(tags) if is_set else ():
+        pipeline.sadd(CACHE_TAG_SET(tag), cache_key)
+        # A tag set outliving its entries only costs a few stale deletes
+        if timeout:
+            pipeline.expire(CACHE_TAG_SET(tag), timeout)
+    # The pipeline is paid for anyway, so pending read counters ride along
+    _write_cache_metrics(pipeline)
+    pipeline.execute()
+
+    return is_set
+
+
+def invalidate_tags(*tags: str) -> int:
+    """Invalidates every cached entry filed under any of the tags
+
+    Args:
+        *tags (str): CACHE_TAGS to invalidate
+
+    Returns:
+        int: Number of cache keys invalidated
+    """
+    if not tags:
+        return 0
+
+    tag_sets = [CACHE_TAG_SET(tag) for tag in set(tags)]
+
+    # Read and drop the sets atomically so keys tagged meanwhile are not lost
+    pipeline = redis_client.pipeline(transaction=True)
+    pipeline.sunion(tag_sets)
+    pipeline.delete(*tag_sets)
+    cache_keys, _ = pipeline.execute()
+
+    if cache_keys:
+        cache_invalidator(list(cache_keys))
+
+    return len(cache_keys)
+
+
+def get_or_recompute(
+    cache_key: str,
+    builder: Callable[[], Any],
+    timeout: int = configs.CACHE_DEFAULT_TIMEOUT,
+    tags: Iterable[str] | Callable[[Any], Iterable[str]] = (),
+) -> Any:
+    """Serves a cached value, letting a single worker recompute it when it goes stale
+
+    Entries record how long their builder took and when they logically expire. Reads
+    refresh early with a probability rising towards expiry (XFetch), so hot keys are
+    usually rebuilt before they expire, and entries outlive their expiry by
+    CACHE_STALE_TIMEOUT. Only the worker holding the key's Redis lock runs the
+    builder; the others serve the stale value, or wait briefly for the fresh one when
+    the entry was invalidated.
+
+    Args:
+        cache_key (str): The Cache Key
+        builder (Callable[[], Any]): Computes the value; returning None skips caching
+        timeout (int, optional): The TTL in Seconds. Defaults to configs.CACHE_DEFAULT_TIMEOUT.
+        tags (Iterable[str] | Callable[[Any], Iterable[str]], optional): CACHE_TAGS to
+            file the key under, or a callable deriving them from the value. Defaults to ().
+
+    Returns:
+        Any: The cached or freshly built value
+    """
+    entry = cache_getter(cache_key)
+
+    if entry is not None and not _should_refresh(entry):
+        return entry["value"]
+
+    lock = redis_client.lock(CACHE_LOCK(cache_key), timeout=configs.CACHE_LOCK_TIMEOUT)
+
+    if not lock.acquire(blocking=False):
+        if entry is None:
+            entry = _wait_for_entry(cache_key)
+
+        if entry is not None:
+            return entry["value"]
+
+        # The lock holder is taking too long; build without it rather than fail
+        return _recompute(cache_key, builder, timeout, tags)
+
+    try:
+        return _recompute(cache_key, builder, timeout, tags)
+    finally:
+        _release_lock(lock)
+
+
+def refresh_entry(
+    cache_key: str,
+    builder: Callable[[], Any],
+    timeout: int = configs.CACHE_DEFAULT_TIMEOUT,
+    tags: Iterable[str] | Callable[[Any], Iterable[str]] = (),
+) -> bool:
+    """Rebuilds an entry get_or_recompute serves before any reader asks for it
+
+    Nothing is done while another worker holds the key's lock, as it is already
+    rebuilding the entry.
+
+    Args:
+        cache_key (str): The Cache Key
+        builder (Callable[[], Any]): Computes the value; returning None skips caching
+        timeout (int, optional): The TTL in Seconds. Defaults to configs.CACHE_DEFAULT_TIMEOUT.
+        tags (Iterable[str] | Callable[[Any], Iterable[str]], optional): CACHE_TAGS to
+            file the key under, or a callable deriving them from the value. Defaults to ().
+
+    Returns:
+        bool: Whether this call rebuilt the entry
+    """
+    lock = redis_client.lock(CACHE_LOCK(cache_key), timeout=configs.CACHE_LOCK_TIMEOUT)
+
+    if not lock.acquire(blocking=False):
+        return False
+
+    try:
+        _recompute(cache_key, builder, timeout, tags)
+        return True
+    finally:
+        _release_lock(lock)
+
+
+def _release_lock(lock: Any) -> None:
+    """Releases a recompute lock that may have expired mid build"""
+    try:
+        lock.release()
+    except LockError:
+        # The lock expired mid build and may now belong to another worker
+        pass
+
+
+def _should_refresh(entry: dict) -> bool:
+    """Decides whether a read should rebuild the entry ahead of its expiry (XFetch)"""
+    # 1 - random() lies in (0, 1], keeping the logarithm finite
+    early_by = -entry["delta"] * configs.CACHE_XFETCH_BETA * math.log(
+        1.0 - random.random()
+    )
+    return time.time() + early_by >= entry["expiry"]
+
+
+def _wait_for_entry(cache_key: str) -> dict | None:
+    """Polls for the entry another worker is building, for up to CACHE_LOCK_WAIT"""
+    deadline = time.monotonic() + configs.CACHE_LOCK_WAIT
+
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = decode_cache_value(cache.get(cache_key))
+
+        if entry is not None:
+            return entry
+
+    return None
+
+
+def _recompute(
+    cache_key: str,
+    builder: Callable[[], Any],
+    timeout: int,
+    tags: Iterable[str] | Callable[[Any], Iterable[str]],
+) -> Any:
+    """Runs the builder and caches its value with the XFetch bookkeeping"""
+    started = time.monotonic()
+    value = builder()
+
+    if value is not None:
+        set_recomputed(
+            cache_key, value, timeout, tags, delta=time.monotonic() - started
+        )
+
+    return value
+
+
+def set_recomputed(
+    cache_key: str,
+    value: Any,
+    timeout: int = configs.CACHE_DEFAULT_TIMEOUT,
+    tags: Iterable[str] | Callable[[Any], Iterable[str]] = (),
+    delta: float = 0.0,
+) -> None:
+    """Caches a value in the entry format get_or_recompute serves
+
+    Lets write paths store a value they derived themselves, e.g. by patching the
+    previous entry, instead of leaving the key for the next reader to rebuild.
+
+    Args:
+        cache_key (str): The Cache Key
+        value (Any): The value
+        timeout (int, optional): The TTL in Seconds. Defaults to configs.CACHE_DEFAULT_TIMEOUT.
+        tags (Iterable[str] | Callable[[Any], Iterable[str]], optional): CACHE_TAGS to
+            file the key under, or a callable deriving them from the value. Defaults to ().
+        delta (float, optional): Seconds a rebuild of the value takes. Defaults to 0.0.
+    """
+    entry = {
+        "value": value,
+        "delta": delta,
+        "expiry": time.time() + timeout,
+    }
+    cache_setter(
+        cache_key,
+        entry,
+        timeout=timeout + configs.CACHE_STALE_TIMEOUT,
+        tags=tags(value) if callable(tags) else tags,
+    )
+
+
+def generational_key(
+    cache_key: str, *generations: str, counters: dict[str, int] | None = None
+) -> str:
+    """Versions a cache key with the current counters of its namespaces
+
+    Entries under retired generations are never read again and age out by TTL.
+
+    Args:
+        cache_key (str): The Cache Key from CACHE_KEYS_REFERENCE
+        *generations (str): CACHE_GENERATIONS the entry derives from
+        counters (dict[str, int] | None, optional): Counters to version with instead
+            of the current ones, per generation. Defaults to None.
+
+    Returns:
+        str: The versioned Cache Key
+    """
+    counters = counters or current_generations(*generations)
+    versions = ".".join(str(counters[generation]) for generation in generations)
+    return f"{cache_key}@{versions}"
+
+
+def current_generations(*generations: str) -> dict[str, int]:
+    """Returns the current counters of cache namespaces, as this worker knows them
+
+    Args:
+        *generations (str): CACHE_GENERATIONS to look up
+
+    Returns:
+        dict[str, int]: Counter per generation
+    """
+    counters = {generation: local_cache.get(generation) for generation in generations}
+    missing = [generation for generation, counter in counters.items() if not counter]
+
+    if missing:
+        for generation, counter in zip(missing, redis_client.mget(missing)):
+            counters[generation] = counter or "0"
+            local_cache.set(generation, counters[generation])
+
+    return {generation: int(counter) for generation, counter in counters.items()}
+
+
+def bump_generation(*generations: str) -> dict[str, int]:
+    """Retires every cache key versioned with the given generations
+
+    Args:
+        *generations (str): CACHE_GENERATIONS to bump
+
+    Returns:
+        dict[str, int]: The new counter per generation
+    """
+    generations = list(set(generations))
+
+    pipeline = redis_client.pipeline(transaction=False)
+    for generation in generations:
+        pipeline.incr(generation)
+    counters = pipeline.execute()
+
+    # Workers cache the counters locally, so they are invalidated like any key
+    local_cache.delete(*generations)
+    publish(CACHE_INVALIDATIONS_CHANNEL, generations)
+
+    return dict(zip(generations, counters))
+
+
+def memoize_by_id(
+    family: str, timeout: int = configs.CACHE_DEFAULT_TIMEOUT
+) -> Callable:
+    """Caches a model method's result under the model instance's Id
+
+    The key comes from the CACHE_KEYS_REFERENCE family, so callers can drop it with
+    invalidate_memoized when the underlying rows change. None results are cached as
+    well, and hits and misses are counted with the family's other cache reads.
+
+    Args:
+        family (str): CACHE_KEYS_REFERENCE entry building the key from the Id
+        timeout (int, optional): The TTL in Seconds. Defaults to configs.CACHE_DEFAULT_TIMEOUT.
+
+    Returns:
+        Callable: The decorator
+    """
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(instance: Any) -> Any:
+            cache_key = CACHE_KEYS_REFERENCE[family](instance.id)
+            cached_value = cache_getter(cache_key)
+
+            if cached_value is not None:
+                return None if cached_value == MEMOIZED_NONE else cached_value
+
+            value = method(instance)
+            cache_setter(
+                cache_key, MEMOIZED_NONE if value is None else value, timeout=timeout
+            )
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_memoized(family: str, *ids: int) -> bool:
+    """Drops the memoize_by_id results of the given model Ids
+
+    Args:
+        family (str): CACHE_KEYS_REFERENCE entry the results were memoized under
+        *ids (int): Model Ids to invalidate
+
+    Returns:
+        bool: Returns True if successful, otherwise False
+    """
+    return cache_invalidator([CACHE_KEYS_REFERENCE[family](id) for id in ids])
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encodes a keyset position into an opaque, URL-safe pagination cursor
+
+    Args:
+        *values (Any): The sort key values of the last item on a page
+
+    Returns:
+        str: The encoded cursor
+    """
+    payload = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decodes a cursor produced by encode_cursor
+
+    Args:
+        cursor (str): The opaque cursor supplied by the client
+
+    Raises:
+        ValueError: If the cursor is malformed
+
+    Returns:
+        list: The sort key values encoded in the cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as error:
+        raise ValueError(f"Invalid cursor: {cursor}") from error
+
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    return values
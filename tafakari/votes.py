@@ -0,0 +1,374 @@
+import copy
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Final
+
+import redis
+from sqlalchemy import select
+
+from ..configs import configs
+from .database import db
+from .extensions import redis_client
+from .models.comments import Comments
+from .models.posts import Post
+from .models.users import User
+from .models.uservotes import (
+    claim_vote_batch,
+    comment_votes_table,
+    post_votes_table,
+    upsert_vote,
+)
+from .utils import (
+    CACHE_GENERATIONS,
+    CACHE_TAGS,
+    _release_lock,
+    bump_generation,
+    invalidate_memoized,
+    invalidate_tags,
+)
+
+# Redis hashes accumulating unflushed vote deltas, with fields named "<id>:<column>"
+VOTE_BUFFERS: Final[dict[str, str]] = {
+    "post": "vote_buffer:post",
+    "comment": "vote_buffer:comment",
+}
+
+# Redis hash a vote buffer is moved to while its deltas are applied
+VOTE_FLUSHING: Final[Callable] = lambda kind: f"{VOTE_BUFFERS[kind]}:flushing"
+
+# Field of a flushing hash naming its batch, claimed in the database once applied
+VOTE_BATCH_FIELD: Final[str] = "batch"
+
+# Redis lock held by the one process flushing the vote buffers
+VOTE_FLUSH_LOCK: Final[str] = "vote_flush_lock"
+
+# Ledger table and its item key column, per kind of votable item
+VOTE_LEDGERS: Final[dict[str, tuple]] = {
+    "post": (post_votes_table, "post_id"),
+    "comment": (comment_votes_table, "comment_id"),
+}
+
+# Redis bitmaps of who voted on an item, with one bit per user id
+VOTE_BITMAPS: Final[Callable] = (
+    lambda kind, item_id, direction: f"voted:{kind}:{item_id}:{direction}"
+)
+
+
+def cast_vote(kind: str, item_id: int, user_id: int, value: int) -> int:
+    """Records a user's up-vote (1) or down-vote (-1) at most once
+
+    Repeat votes are caught by a per item Redis bitmap without touching Postgres.
+    Otherwise the vote ledger is upserted, which also catches repeats the bitmaps
+    have forgotten, and the net change is buffered for the next flush.
+
+    Args:
+        kind (str): Either "post" or "comment"
+        item_id (int): Id of the voted post or comment
+        user_id (int): Id of the voting user
+        value (int): 1 for an up-vote, -1 for a down-vote
+
+    Returns:
+        int: Net change to the item's votes; 0 when the vote was a repeat
+    """
+    direction, opposite = ("up", "down") if value > 0 else ("down", "up")
+    voted = VOTE_BITMAPS(kind, item_id, direction)
+    opposite_voted = VOTE_BITMAPS(kind, item_id, opposite)
+
+    pipeline = redis_client.pipeline()
+    pipeline.setbit(voted, user_id, 1)
+    pipeline.setbit(opposite_voted, user_id, 0)
+    pipeline.expire(voted, configs.VOTE_BITMAP_TIMEOUT)
+    pipeline.expire(opposite_voted, configs.VOTE_BITMAP_TIMEOUT)
+    already_voted, opposite_was_voted, *_ = pipeline.execute()
+
+    if already_voted:
+        return 0
+
+    table, item_column = VOTE_LEDGERS[kind]
+    try:
+        net_change = upsert_vote(table, item_column, user_id, item_id, value)
+        db.session.commit()
+    except Exception:
+        # Without a recorded vote the bits would turn away a retry as a repeat
+        db.session.rollback()
+        pipeline = redis_client.pipeline()
+        pipeline.setbit(voted, user_id, 0)
+        pipeline.setbit(opposite_voted, user_id, opposite_was_voted)
+        pipeline.execute()
+        raise
+
+    if net_change:
+        # Switching sides removes the earlier vote from the opposite tally
+        switched = abs(net_change) > 1
+        if value > 0:
+            record_vote(kind, item_id, upvotes=1, downvotes=-1 if switched else 0)
+        else:
+            record_vote(kind, item_id, upvotes=-1 if switched else 0, downvotes=1)
+
+    return net_change
+
+
+def record_vote(kind: str, item_id: int, upvotes: int = 0, downvotes: int = 0) -> None:
+    """Buffers a vote in Redis until the next flush
+
+    Args:
+        kind (str): Either "post" or "comment"
+        item_id (int): Id of the voted post or comment
+        upvotes (int, optional): Up-votes to add. Defaults to 0.
+        downvotes (int, optional): Down-votes to add. Defaults to 0.
+    """
+    buffer = VOTE_BUFFERS[kind]
+
+    pipeline = redis_client.pipeline()
+    pipeline.hincrby(buffer, f"{item_id}:votes", upvotes - downvotes)
+
+    if kind == "post":
+        # Posts also keep tallies for the controversial ranking
+        if upvotes:
+            pipeline.hincrby(buffer, f"{item_id}:upvotes", upvotes)
+        if downvotes:
+            pipeline.hincrby(buffer, f"{item_id}:downvotes", downvotes)
+
+    pipeline.execute()
+
+
+def pending_votes(kind: str, item_ids: list[int]) -> dict[int, int]:
+    """Returns the unflushed net votes of posts or comments
+
+    Args:
+        kind (str): Either "post" or "comment"
+        item_ids (list[int]): Ids to look up
+
+    Returns:
+        dict[int, int]: Id to pending net votes, for ids that have any
+    """
+    if not item_ids:
+        return {}
+
+    fields = [f"{item_id}:votes" for item_id in item_ids]
+
+    # Votes being flushed still count until the flush has committed them
+    pipeline = redis_client.pipeline(transaction=False)
+    pipeline.hmget(VOTE_BUFFERS[kind], fields)
+    pipeline.hmget(VOTE_FLUSHING(kind), fields)
+    buffered, flushing = pipeline.execute()
+
+    totals = {
+        item_id: int(value or 0) + int(flushing_value or 0)
+        for item_id, value, flushing_value in zip(item_ids, buffered, flushing)
+    }
+    return {item_id: total for item_id, total in totals.items() if total}
+
+
+def _collect_voted_items(node: Any, kind: str | None, found: dict[str, list]) -> None:
+    """Collects the post and comment dicts carrying votes in a serialised response"""
+    if isinstance(node, list):
+        for item in node:
+            _collect_voted_items(item, kind, found)
+
+    elif isinstance(node, dict):
+        if kind and "id" in node and "votes" in node:
+            found[kind].append(node)
+
+        for key, child_kind in (
+            ("posts", "post"),
+            ("comments", "comment"),
+            ("replies", "comment"),
+            ("ancestors", "comment"),
+            ("comment", "comment"),
+        ):
+            if key in node:
+                _collect_voted_items(node[key], child_kind, found)
+
+
+def voted_item_ids(payload: Any, kind: str | None = "post") -> dict[str, list[int]]:
+    """Returns the ids of the posts and comments whose votes a serialised response shows
+
+    Args:
+        payload (Any): Serialised post, posts listing, or profile
+        kind (str | None, optional): What the payload root is. Defaults to "post".
+
+    Returns:
+        dict[str, list[int]]: Ids per kind, for kinds the payload shows
+    """
+    found: dict[str, list] = {"post": [], "comment": []}
+    _collect_voted_items(payload, kind, found)
+
+    return {
+        item_kind: [item["id"] for item in items]
+        for item_kind, items in found.items()
+        if items
+    }
+
+
+def overlay_pending_votes(
+    payload: dict,
+    kind: str | None = "post",
+    pending: dict[str, dict[int, int]] | None = None,
+) -> dict:
+    """Adds unflushed votes to the vote counts of a serialised response
+
+    The payload is left untouched; a copy is returned when any count changes.
+
+    Args:
+        payload (dict): Serialised post, posts listing, or profile
+        kind (str | None, optional): What the payload root is. Defaults to "post".
+        pending (dict[str, dict[int, int]] | None, optional): Pending votes per kind,
+            when already looked up. Defaults to None.
+
+    Returns:
+        dict: The payload with up to date vote counts
+    """
+    if pending is None:
+        pending = {
+            item_kind: pending_votes(item_kind, item_ids)
+            for item_kind, item_ids in voted_item_ids(payload, kind).items()
+        }
+
+    if not any(pending.values()):
+        return payload
+
+    payload = copy.deepcopy(payload)
+    found: dict[str, list] = {"post": [], "comment": []}
+    _collect_voted_items(payload, kind, found)
+
+    for item_kind, items in found.items():
+        for item in items:
+            item["votes"] += pending.get(item_kind, {}).get(item["id"], 0)
+
+    return payload
+
+
+def _take_buffer(kind: str) -> tuple[str, str | None, dict[int, dict[str, int]]]:
+    """Moves a vote buffer aside so new votes accumulate in a fresh hash
+
+    Returns:
+        tuple[str, str | None, dict[int, dict[str, int]]]: The flushing key, its
+            batch id and its parsed deltas
+    """
+    buffer = VOTE_BUFFERS[kind]
+    flushing = VOTE_FLUSHING(kind)
+
+    # A leftover flushing hash means the previous flush died; finish it first
+    if not redis_client.exists(flushing):
+        try:
+            redis_client.rename(buffer, flushing)
+        except redis.ResponseError:
+            return flushing, None, {}
+
+    # The batch keeps its id when retried, so a batch committed by a flush that died
+    # before deleting the hash is not applied again
+    redis_client.hsetnx(flushing, VOTE_BATCH_FIELD, str(uuid.uuid4()))
+    fields = redis_client.hgetall(flushing)
+    batch_id = fields.pop(VOTE_BATCH_FIELD)
+
+    deltas: dict[int, dict[str, int]] = defaultdict(dict)
+    for field, value in fields.items():
+        item_id, vote_column = field.split(":")
+        if int(value):
+            deltas[int(item_id)][vote_column] = int(value)
+
+    return flushing, batch_id, deltas
+
+
+def _apply_buffer(kind: str, bulk_apply: Callable[[dict], list]) -> list:
+    """Applies a vote buffer's deltas at most once, then drops the buffer
+
+    Args:
+        kind (str): Either "post" or "comment"
+        bulk_apply (Callable[[dict], list]): The model's bulk_apply_votes
+
+    Returns:
+        list: Rows updated, empty when the batch was already applied
+    """
+    flushing, batch_id, deltas = _take_buffer(kind)
+    updated = bulk_apply(deltas) if deltas and claim_vote_batch(batch_id) else []
+    db.session.commit()
+    redis_client.delete(flushing)
+
+    return updated
+
+
+def _user_tags(user_ids: set[int]) -> list[str]:
+    """Cache tags of the given users"""
+    usernames = db.session.execute(
+        select(User.username).where(User.id.in_(user_ids))
+    ).scalars()
+    return [CACHE_TAGS["USER"](username) for username in usernames]
+
+
+def flush_buffered_votes(
+    on_feeds_retired: Callable[[set[int]], None] | None = None
+) -> dict[str, int]:
+    """Applies buffered votes to the database in batched UPDATEs
+
+    Cached views of the updated rows are invalidated, since their counts no longer
+    need the pending overlay. Only one process flushes at a time; others return
+    without flushing.
+
+    Args:
+        on_feeds_retired (Callable[[set[int]], None] | None, optional): Called with
+            the ids of the subreddits whose feeds were retired, e.g. to warm them
+            again. Defaults to None.
+
+    Returns:
+        dict[str, int]: Number of posts and comments updated
+    """
+    lock = redis_client.lock(VOTE_FLUSH_LOCK, timeout=configs.VOTE_FLUSH_LOCK_TIMEOUT)
+
+    if not lock.acquire(blocking=False):
+        return {"posts": 0, "comments": 0}
+
+    try:
+        return _flush_buffers(on_feeds_retired)
+    finally:
+        _release_lock(lock)
+
+
+def _flush_buffers(
+    on_feeds_retired: Callable[[set[int]], None] | None
+) -> dict[str, int]:
+    """Flushes the post and then the comment vote buffers, under the flush lock"""
+    flushed = {}
+
+    updated_posts = _apply_buffer("post", Post.bulk_apply_votes)
+
+    if updated_posts:
+        invalidate_tags(*[CACHE_TAGS["POST"](row.id) for row in updated_posts])
+        # Rankings may shift, so every feed of the posts' subreddits is retired
+        subreddit_ids = {row.belongs_to for row in updated_posts}
+        bump_generation(
+            *[
+                CACHE_GENERATIONS["SUBREDDIT"](subreddit_id)
+                for subreddit_id in subreddit_ids
+            ]
+        )
+        if on_feeds_retired:
+            on_feeds_retired(subreddit_ids)
+    flushed["posts"] = len(updated_posts)
+
+    updated_comments = _apply_buffer("comment", Comments.bulk_apply_votes)
+
+    if updated_comments:
+        invalidate_tags(
+            *[
+                CACHE_TAGS["POST_COMMENTS"](post_id)
+                for post_id in {row.post_id for row in updated_comments}
+            ],
+            *_user_tags({row.user_id for row in updated_comments}),
+        )
+        invalidate_memoized(
+            "COMMENT_REPLIES",
+            *{row.parent_id for row in updated_comments if row.parent_id},
+        )
+        invalidate_memoized(
+            "COMMENT_PARENT",
+            *db.session.execute(
+                select(Comments.id).where(
+                    Comments.parent_id.in_([row.id for row in updated_comments])
+                )
+            ).scalars(),
+        )
+    flushed["comments"] = len(updated_comments)
+
+    return flushed
@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging import getLogger
+from typing import Any, Callable, Iterator
+
+from flask import Flask, current_app
+
+from ..configs import configs
+
+logger = getLogger("default")
+
+# Rebuilds cache entries retired by a write without holding up its response
+warming_executor = ThreadPoolExecutor(
+    max_workers=configs.CACHE_WARM_WORKERS, thread_name_prefix="cache-warm"
+)
+
+
+def schedule_warming(*warmers: Callable[[], Any], wait: bool = False) -> None:
+    """Runs cache warmers in the background, each within its own app context
+
+    Warmers run inline when waiting is asked for and under testing, so the entries
+    are in place once this returns.
+
+    Args:
+        *warmers (Callable[[], Any]): Functions rebuilding cache entries
+        wait (bool, optional): Run the warmers before returning. Defaults to False.
+    """
+    app = current_app._get_current_object()
+
+    for warmer in warmers:
+        if wait or app.testing:
+            _run_warmer(app, warmer)
+        else:
+            warming_executor.submit(_run_warmer, app, warmer)
+
+
+def warm_concurrently(
+    warmers: list[tuple[str, Callable[[], Any]]], concurrency: int
+) -> Iterator[tuple[str, float, bool]]:
+    """Runs labelled cache warmers on a bounded pool, yielding each as it finishes
+
+    Args:
+        warmers (list[tuple[str, Callable[[], Any]]]): Key family and warmer pairs
+        concurrency (int): Warmers run at once, and so database connections held
+
+    Yields:
+        Iterator[tuple[str, float, bool]]: Key family, seconds taken and success of
+            each warmer, in completion order
+    """
+    app = current_app._get_current_object()
+
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="cache-warm"
+    ) as executor:
+        futures = {
+            executor.submit(_timed_warmer, app, warmer): family
+            for family, warmer in warmers
+        }
+
+        for future in as_completed(futures):
+            seconds, succeeded = future.result()
+            yield futures[future], seconds, succeeded
+
+
+def _timed_warmer(app: Flask, warmer: Callable[[], Any]) -> tuple[float, bool]:
+    """Runs a warmer, returning how long it took and whether it succeeded"""
+    started = time.perf_counter()
+    succeeded = _run_warmer(app, warmer)
+    return time.perf_counter() - started, succeeded
+
+
+def _run_warmer(app: Flask, warmer: Callable[[], Any]) -> bool:
+    """Runs a warmer, logging rather than raising its failures"""
+    with app.app_context():
+        try:
+            warmer()
+            return True
+        except Exception:
+            # A cold key is rebuilt by its next reader anyway
+            logger.exception("Cache warming failed")
+            return False
@@ -1,14 +1,23 @@
+from contextlib import contextmanager
 from http import HTTPStatus
+from typing import Callable, Iterator
 
 import pytest
 from flask import Flask
 from flask.testing import FlaskClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
 from tafakari import create_app
 from tafakari.configs import configs
 from tafakari.tafakari import db
+from tafakari.tafakari.extensions import (
+    cache,
+    cache_metrics,
+    local_cache,
+    redis_client,
+    request_metrics,
+)
 
 engine = create_engine(configs.POSTGRES_DSN)
 
@@ -31,6 +40,45 @@ def client_app(app: Flask) -> FlaskClient:
         yield app.test_client()
         db.session.remove()
         drop_database(engine.url)
+        # Buffered votes, vote bitmaps, cache tags and cached responses must not leak
+        # into the next test's database
+        redis_client.flushdb()
+        cache.clear()
+        local_cache.clear()
+        cache_metrics.drain()
+        request_metrics.drain()
+
+
+@pytest.fixture()
+def assert_num_queries(client_app: FlaskClient) -> Callable:
+    """Returns a context manager asserting how many SQL statements its block issues
+
+    Args:
+        client_app (FlaskClient): The Flask Test Client
+
+    Returns:
+        Callable: Context manager taking the expected number of statements
+    """
+
+    @contextmanager
+    def counter(expected: int) -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def record_statement(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record_statement)
+
+        assert len(statements) == expected, (
+            f"Expected {expected} SQL statements, got {len(statements)}:\n"
+            + "\n".join(statements)
+        )
+
+    return counter
 
 
 @pytest.fixture()
@@ -1,7 +1,17 @@
 from http import HTTPStatus
 
+import time
+import uuid
+
 from flask.testing import FlaskClient
 
+from ..tafakari.controllers.authentication import (
+    JWT_REVOKED_TOKENS_SINCE,
+    check_if_token_is_revoked,
+    jwt_redis_blocklist,
+)
+from ..tafakari.extensions import revoked_tokens
+
 
 def test_login_user_successful(register_test_user, client_app: FlaskClient) -> None:
     """Tests the Login User Controller
@@ -78,6 +88,44 @@ def test_logout(login_test_user, client_app: FlaskClient) -> None:
     assert response.json["message"] == "Access token revoked"
 
 
+def test_revoked_token_rejected(login_test_user, client_app: FlaskClient) -> None:
+    """Tests a token is rejected after logout, also once the revoked ids are synced
+
+    Args:
+        login_test_user (any): Dummy user's access token
+        client_app (FlaskClient): Test Client
+    """
+    headers = {
+        "Authorization": f"Bearer {login_test_user}",
+        "Content-Type": "application/json",
+    }
+
+    with client_app as test_client:
+        test_client.delete("/auth/logout", headers=headers)
+        response = test_client.delete("/auth/logout", headers=headers)
+
+        revoked_tokens.mark_stale()
+        synced_response = test_client.delete("/auth/logout", headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert synced_response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_token_revoked_before_the_filter_rejected(client_app: FlaskClient) -> None:
+    """Tests a token revoked before the revoked token set was kept is still rejected
+
+    Args:
+        client_app (FlaskClient): Test Client
+    """
+    jti = str(uuid.uuid4())
+    jwt_redis_blocklist.set(jti, "", ex=60)
+    jwt_redis_blocklist.set(JWT_REVOKED_TOKENS_SINCE, time.time())
+    revoked_tokens.mark_stale()
+
+    assert check_if_token_is_revoked({}, {"jti": jti})
+    assert not check_if_token_is_revoked({}, {"jti": str(uuid.uuid4())})
+
+
 def test_logout_no_jwt_headers(client_app: FlaskClient) -> None:
     """Tests Logout User Controller when no bearer token header is supplied
 
@@ -1,7 +1,16 @@
 from tafakari.tafakari.models.comments import Comments
-from tafakari.tafakari.models.posts import Post
+import pendulum
+
+from tafakari.tafakari.database import db
+from tafakari.tafakari.models.posts import Post, controversy_score, hot_score
 from tafakari.tafakari.models.subreddit import Subreddit
 from tafakari.tafakari.models.users import User, check_password
+from tafakari.tafakari.utils import (
+    CACHE_KEYS_REFERENCE,
+    MEMOIZED_NONE,
+    cache_getter,
+    invalidate_memoized,
+)
 
 
 def test_user_model() -> None:
@@ -52,6 +61,18 @@ def test_post_model(create_mock_subreddit: dict) -> None:
     post.delete()
 
 
+def test_post_ranking_scores() -> None:
+    """Tests the hot and controversy ranking functions"""
+    now = pendulum.now()
+
+    assert hot_score(10, now) > hot_score(1, now)
+    assert hot_score(1, now) > hot_score(1, now.subtract(days=1))
+    assert hot_score(-10, now) < hot_score(0, now)
+
+    assert controversy_score(10, 0) == 0.0
+    assert controversy_score(50, 50) > controversy_score(90, 10)
+
+
 def test_comments_model(create_mock_post: dict) -> None:
     """Tests the Comment Model
 
@@ -66,3 +87,153 @@ def test_comments_model(create_mock_post: dict) -> None:
     assert comment.comment == "Post Comment"
 
     comment.delete()
+
+
+def test_comment_tree(create_mock_post: dict) -> None:
+    """Tests loading a Post's comments as a depth and breadth limited thread
+
+    Args:
+        create_mock_post (dict): Dummy Post Record
+    """
+    root = Comments.create(comment="Root", votes=5, user_id=1, post_id=1)
+    other_root = Comments.create(comment="Other Root", user_id=1, post_id=1)
+    reply = Comments.create(
+        comment="Reply", votes=3, user_id=1, post_id=1, parent_id=root.id
+    )
+    Comments.create(comment="Low Reply", user_id=1, post_id=1, parent_id=root.id)
+    Comments.create(comment="Nested", user_id=1, post_id=1, parent_id=reply.id)
+
+    thread = Comments.get_comment_tree(1, max_depth=2, top_n_children=1)
+
+    assert [comment.id for comment in thread.comments] == [root.id]
+    assert [comment.id for comment in thread.comments[0].replies] == [reply.id]
+    assert thread.comments[0].replies[0].replies == []
+
+    full_thread = Comments.get_comment_tree(1, max_depth=3, top_n_children=10)
+
+    assert [comment.id for comment in full_thread.comments] == [root.id, other_root.id]
+    assert len(full_thread.comments[0].replies) == 2
+    assert full_thread.comments[0].replies[0].replies[0].comment == "Nested"
+
+
+def test_comments_page(create_mock_post: dict) -> None:
+    """Tests paging through a Post's top-level comments and a comment's replies
+
+    Args:
+        create_mock_post (dict): Dummy Post Record
+    """
+    top = Comments.create(comment="Top", votes=10, user_id=1, post_id=1)
+    middle = Comments.create(comment="Middle", votes=5, user_id=1, post_id=1)
+    bottom = Comments.create(comment="Bottom", votes=1, user_id=1, post_id=1)
+    reply = Comments.create(comment="Reply", user_id=1, post_id=1, parent_id=top.id)
+
+    first_page = Comments.get_comments_page(1, limit=2)
+
+    assert [comment.id for comment in first_page.comments] == [top.id, middle.id]
+    assert first_page.comments[0].reply_count == 1
+    assert first_page.comments[1].replies_cursor is None
+
+    parent_id, sort, after = Comments.decode_page_cursor(first_page.next_cursor)
+    second_page = Comments.get_comments_page(1, parent_id, sort, limit=2, after=after)
+
+    assert [comment.id for comment in second_page.comments] == [bottom.id]
+    assert second_page.next_cursor is None
+
+    parent_id, sort, after = Comments.decode_page_cursor(
+        first_page.comments[0].replies_cursor
+    )
+    replies = Comments.get_comments_page(1, parent_id, sort, after=after)
+
+    assert [comment.id for comment in replies.comments] == [reply.id]
+
+
+def test_comment_path(create_mock_post: dict) -> None:
+    """Tests the materialised path of replies and the queries built on it
+
+    Args:
+        create_mock_post (dict): Dummy Post Record
+    """
+    root = Comments.create(comment="Root", user_id=1, post_id=1)
+    reply = Comments.create(comment="Reply", user_id=1, post_id=1, parent_id=root.id)
+    nested = Comments.create(
+        comment="Nested", user_id=1, post_id=1, parent_id=reply.id
+    )
+
+    assert root.path == f"{root.id}/"
+    assert nested.path == f"{root.id}/{reply.id}/{nested.id}/"
+    assert nested.depth == 3
+
+    assert [ancestor.id for ancestor in nested.get_ancestors()] == [root.id, reply.id]
+    assert [ancestor.id for ancestor in nested.get_ancestors(levels=1)] == [reply.id]
+    assert nested.get_ancestors(levels=0) == []
+    assert [ancestor.id for ancestor in nested.get_ancestors(levels=2)] == [
+        root.id,
+        reply.id,
+    ]
+    assert [ancestor.id for ancestor in nested.get_ancestors(levels=3)] == [
+        root.id,
+        reply.id,
+    ]
+    assert reply.get_ancestors(levels=3)[0].id == root.id
+    assert root.get_ancestors(levels=3) == []
+
+    subtree = root.get_subtree(max_depth=2)
+
+    assert subtree.id == root.id
+    assert [child.id for child in subtree.replies] == [reply.id]
+    assert subtree.replies[0].replies == []
+
+
+def test_memoized_comment_replies(
+    create_mock_post: dict, assert_num_queries
+) -> None:
+    """Tests replies are memoized per comment Id and dropped on invalidation
+
+    Args:
+        create_mock_post (dict): Dummy Post Record
+        assert_num_queries (Callable): Counts the SQL statements run in a block
+    """
+    root = Comments.create(comment="Root", user_id=1, post_id=1)
+    first = Comments.create(comment="First", user_id=1, post_id=1, parent_id=root.id)
+
+    assert [reply.id for reply in root.get_direct_comment_replies().comments] == [
+        first.id
+    ]
+
+    # A fresh instance of the same row is served from the cache
+    fresh_root = Comments.get_by_id(root.id)
+    with assert_num_queries(0):
+        fresh_root.get_direct_comment_replies()
+
+    # Top-level comments have no parent, which is memoized too
+    assert root.get_parent_comment() is None
+    assert (
+        cache_getter(CACHE_KEYS_REFERENCE["COMMENT_PARENT"](root.id)) == MEMOIZED_NONE
+    )
+    assert Comments.get_by_id(root.id).get_parent_comment() is None
+
+    second = Comments.create(comment="Second", user_id=1, post_id=1, parent_id=root.id)
+    invalidate_memoized("COMMENT_REPLIES", root.id)
+
+    assert {reply.id for reply in root.get_direct_comment_replies().comments} == {
+        first.id,
+        second.id,
+    }
+
+
+def test_user_snapshot_cached_until_user_changes(assert_num_queries) -> None:
+    snapshot = User.get_snapshot("tester")
+
+    with assert_num_queries(0):
+        assert User.get_snapshot("tester") == snapshot
+
+    # Uncommitted changes leave the cached identity in place
+    User.get_by_id(snapshot.id).update(commit=False, username="renamed")
+    db.session.flush()
+
+    assert User.get_snapshot("tester") == snapshot
+
+    db.session.commit()
+
+    assert User.get_snapshot("tester") is None
+    assert User.get_snapshot("renamed").id == snapshot.id
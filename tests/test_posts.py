@@ -1,8 +1,23 @@
 from http import HTTPStatus
 
 from flask.testing import FlaskClient
+from pytest import MonkeyPatch, raises
 
+from ..tafakari.extensions import cache, local_cache, redis_client
 from ..tafakari.models.posts import Post
+from ..tafakari import votes
+from ..tafakari.controllers.posts import insert_into_new_feed, subreddit_feed_key
+from ..tafakari.responses import cacheable_response
+from ..tafakari.utils import cache_getter
+from ..tafakari.votes import (
+    VOTE_BITMAPS,
+    VOTE_FLUSHING,
+    _take_buffer,
+    cast_vote,
+    flush_buffered_votes,
+    pending_votes,
+    record_vote,
+)
 from .test_subreddits import set_authorization_token
 
 
@@ -226,6 +241,154 @@ def test_get_all_posts(
     assert isinstance(response.json["posts"][0], dict)
 
 
+def test_get_all_posts_paginated(
+    client_app: FlaskClient, login_test_user: str, create_mock_post: dict
+) -> None:
+    with client_app as test_client:
+        for index in range(2):
+            test_client.post(
+                "/posts",
+                json={"subreddit_id": 1, "title": f"Post {index}", "text": "Paged"},
+                headers=set_authorization_token(login_test_user),
+            )
+
+        first_page = test_client.get("/posts?limit=2")
+        second_page = test_client.get(
+            f"/posts?limit=2&cursor={first_page.json['next_cursor']}"
+        )
+
+    assert first_page.status_code == HTTPStatus.OK
+    assert len(first_page.json["posts"]) == 2
+    assert first_page.json["posts"][0]["title"] == "Post 1"
+
+    assert second_page.status_code == HTTPStatus.OK
+    assert len(second_page.json["posts"]) == 1
+    assert second_page.json["posts"][0]["title"] == "Test Post"
+    assert "next_cursor" not in second_page.json
+
+
+def test_get_all_posts_invalid_cursor(
+    client_app: FlaskClient, create_mock_post: dict
+) -> None:
+    with client_app as test_client:
+        response = test_client.get("/posts?cursor=not-a-cursor")
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_get_all_posts_loads_creators_in_bulk(
+    client_app: FlaskClient, create_mock_post: dict, assert_num_queries
+) -> None:
+    with client_app as test_client:
+        test_client.post(
+            "/auth/register",
+            json=dict(username="poster", email="poster@email.com", password="password"),
+        )
+        token = test_client.post(
+            "/auth/login",
+            json=dict(username="poster", email="poster@email.com", password="password"),
+        ).json["access_token"]
+        test_client.post(
+            "/posts",
+            json={"subreddit_id": 1, "title": "Another Post", "text": "By poster"},
+            headers=set_authorization_token(token),
+        )
+        # Drop the listings warmed by the new post so these requests build them
+        cache.clear()
+        local_cache.clear()
+
+        with assert_num_queries(1):
+            all_posts = test_client.get("/posts")
+
+        with assert_num_queries(2):
+            subreddit_posts = test_client.get("/subreddits/1/posts")
+
+    assert all_posts.status_code == HTTPStatus.OK
+    assert {post["user"]["username"] for post in all_posts.json["posts"]} == {
+        "tester",
+        "poster",
+    }
+    assert subreddit_posts.status_code == HTTPStatus.OK
+    assert len(subreddit_posts.json["posts"]) == 2
+
+
+def test_get_all_posts_in_subreddit_sorted(
+    client_app: FlaskClient, login_test_user: str, create_mock_post: dict
+) -> None:
+    with client_app as test_client:
+        test_client.post(
+            "/posts",
+            json={"subreddit_id": 1, "title": "Newer Post", "text": "Newer"},
+            headers=set_authorization_token(login_test_user),
+        )
+        test_client.get(
+            "/posts/1/upvote", headers=set_authorization_token(login_test_user)
+        )
+        flush_buffered_votes()
+
+        top = test_client.get("/subreddits/1/posts?sort=top")
+        new = test_client.get("/subreddits/1/posts?sort=new")
+        limited = test_client.get("/subreddits/1/posts?sort=hot&limit=1")
+
+    assert top.status_code == HTTPStatus.OK
+    assert [post["id"] for post in top.json["posts"]] == [1, 2]
+    assert [post["id"] for post in new.json["posts"]] == [2, 1]
+    assert len(limited.json["posts"]) == 1
+
+
+def test_new_post_retires_cached_feeds(
+    client_app: FlaskClient, login_test_user: str, create_mock_post: dict
+) -> None:
+    with client_app as test_client:
+        assert len(test_client.get("/posts").json["posts"]) == 1
+        assert len(test_client.get("/subreddits/1/posts?sort=new").json["posts"]) == 1
+
+        test_client.post(
+            "/posts",
+            json={"subreddit_id": 1, "title": "Newer Post", "text": "Newer"},
+            headers=set_authorization_token(login_test_user),
+        )
+
+        all_posts = test_client.get("/posts")
+        subreddit_posts = test_client.get("/subreddits/1/posts?sort=new")
+
+    assert [post["id"] for post in all_posts.json["posts"]] == [2, 1]
+    assert [post["id"] for post in subreddit_posts.json["posts"]] == [2, 1]
+
+
+def test_new_post_warms_listings(
+    client_app: FlaskClient,
+    login_test_user: str,
+    create_mock_post: dict,
+    assert_num_queries,
+) -> None:
+    with client_app as test_client:
+        test_client.post(
+            "/posts",
+            json={"subreddit_id": 1, "title": "Newer Post", "text": "Newer"},
+            headers=set_authorization_token(login_test_user),
+        )
+
+        # The write rebuilt the first page and every feed of the subreddit
+        with assert_num_queries(0):
+            all_posts = test_client.get("/posts")
+            hot = test_client.get("/subreddits/1/posts?sort=hot")
+            new = test_client.get("/subreddits/1/posts?sort=new")
+
+    assert [post["id"] for post in all_posts.json["posts"]] == [2, 1]
+    assert {post["id"] for post in hot.json["posts"]} == {1, 2}
+    assert [post["id"] for post in new.json["posts"]] == [2, 1]
+
+
+def test_get_all_posts_in_subreddit_invalid_sort(
+    client_app: FlaskClient, create_mock_post: dict
+) -> None:
+    with client_app as test_client:
+        response = test_client.get("/subreddits/1/posts?sort=best")
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
 def test_get_post_by_id(
     client_app: FlaskClient, create_mock_subreddit: dict, create_mock_post: dict
 ) -> None:
@@ -238,6 +401,27 @@ def test_get_post_by_id(
     assert json_response["id"] == post_id
 
 
+def test_get_post_by_id_conditional(
+    client_app: FlaskClient, login_test_user: str, create_mock_post: dict
+) -> None:
+    with client_app as test_client:
+        response = test_client.get("/posts/1")
+        etag = response.headers["ETag"]
+
+        not_modified = test_client.get("/posts/1", headers={"If-None-Match": etag})
+
+        test_client.get(
+            "/posts/1/upvote", headers=set_authorization_token(login_test_user)
+        )
+        modified = test_client.get("/posts/1", headers={"If-None-Match": etag})
+
+    assert response.headers["Cache-Control"].startswith("public")
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.get_data() == b""
+    assert modified.status_code == HTTPStatus.OK
+    assert modified.headers["ETag"] != etag
+
+
 def test_get_non_existent_post_by_id(
     client_app: FlaskClient, create_mock_subreddit: dict, create_mock_post: dict
 ) -> None:
@@ -263,10 +447,124 @@ def test_upvote_a_post(
 
     assert response.status_code == HTTPStatus.ACCEPTED
 
+    flushed = flush_buffered_votes()
     post: Post = Post.get_by_id(post_id)
 
+    assert flushed["posts"] == 1
     assert post is not None
     assert post.votes == 2
+    assert post.upvotes == 1
+
+
+def test_upvote_served_before_flush(
+    client_app: FlaskClient,
+    login_test_user: str,
+    create_mock_post: dict,
+) -> None:
+    post_id = 1
+    with client_app as test_client:
+        test_client.get(f"/posts/{post_id}")
+        test_client.get(
+            f"/posts/{post_id}/upvote", headers=set_authorization_token(login_test_user)
+        )
+        response = test_client.get(f"/posts/{post_id}")
+
+    assert response.json["votes"] == 2
+    assert Post.get_by_id(post_id).votes == 1
+
+    flush_buffered_votes()
+
+
+def test_new_feed_patched_only_after_its_own_bump(create_mock_post: dict) -> None:
+    """Tests the new feed is not patched when another write bumped its generation too
+
+    Args:
+        create_mock_post (dict): Dummy Post Record
+    """
+    previous_feed = {"value": cacheable_response({"posts": []}), "delta": 0.0}
+    post = {"id": 2, "title": "Second", "votes": 1}
+
+    # Another post or a vote flush bumped the generation in between
+    assert not insert_into_new_feed(1, post, previous_feed, read_under=4, bumped_to=6)
+    assert cache_getter(subreddit_feed_key(1, "new", generation=6)) is None
+
+    assert insert_into_new_feed(1, post, previous_feed, read_under=5, bumped_to=6)
+    assert cache_getter(subreddit_feed_key(1, "new", generation=6)) is not None
+
+
+def test_flush_applies_a_batch_once(create_mock_post: dict) -> None:
+    """Tests a batch left behind by a flush that died after committing is not reapplied
+
+    Args:
+        create_mock_post (dict): Dummy Post Record
+    """
+    record_vote("post", 1, upvotes=1)
+    _take_buffer("post")
+    leftover = redis_client.hgetall(VOTE_FLUSHING("post"))
+
+    # Votes being flushed are still shown
+    assert pending_votes("post", [1]) == {1: 1}
+
+    assert flush_buffered_votes()["posts"] == 1
+
+    # As if the process died before deleting the flushing hash
+    redis_client.hset(VOTE_FLUSHING("post"), mapping=leftover)
+
+    assert flush_buffered_votes()["posts"] == 0
+    assert not redis_client.exists(VOTE_FLUSHING("post"))
+    assert Post.get_by_id(1).votes == 2
+
+
+def test_upvote_a_post_twice(
+    client_app: FlaskClient,
+    login_test_user: str,
+    create_mock_post: dict,
+) -> None:
+    post_id = 1
+    with client_app as test_client:
+        first = test_client.get(
+            f"/posts/{post_id}/upvote", headers=set_authorization_token(login_test_user)
+        )
+        repeat = test_client.get(
+            f"/posts/{post_id}/upvote", headers=set_authorization_token(login_test_user)
+        )
+        switched = test_client.get(
+            f"/posts/{post_id}/downvote",
+            headers=set_authorization_token(login_test_user),
+        )
+
+    assert first.status_code == HTTPStatus.ACCEPTED
+    assert repeat.status_code == HTTPStatus.CONFLICT
+    assert switched.status_code == HTTPStatus.ACCEPTED
+
+    flush_buffered_votes()
+    post: Post = Post.get_by_id(post_id)
+
+    assert post.votes == 0
+    assert post.upvotes == 0
+    assert post.downvotes == 1
+
+
+def test_failed_vote_not_remembered(
+    create_mock_post: dict, monkeypatch: MonkeyPatch
+) -> None:
+    """Tests a vote the database failed to record can be cast again
+
+    Args:
+        create_mock_post (dict): Dummy Post Record
+        monkeypatch (MonkeyPatch): Pytest monkeypatch fixture
+    """
+
+    def failing_upsert(*args) -> int:
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(votes, "upsert_vote", failing_upsert)
+        with raises(RuntimeError):
+            cast_vote("post", 1, 1, 1)
+
+    assert not redis_client.getbit(VOTE_BITMAPS("post", 1, "up"), 1)
+    assert cast_vote("post", 1, 1, 1) == 1
 
 
 def test_upvote_a_non_existent_post(
@@ -330,10 +628,12 @@ def test_downvote_a_post(
 
     assert response.status_code == HTTPStatus.ACCEPTED
 
+    flush_buffered_votes()
     post: Post = Post.get_by_id(post_id)
 
     assert post is not None
     assert post.votes == 0
+    assert post.downvotes == 1
 
 
 def test_downvote_a_non_existent_post(
@@ -402,6 +702,22 @@ def test_delete_a_post(
     assert post is None
 
 
+def test_delete_a_post_invalidates_listings(
+    client_app: FlaskClient, login_test_user: str, create_mock_post: dict
+) -> None:
+    with client_app as test_client:
+        assert test_client.get("/posts").status_code == HTTPStatus.OK
+        assert test_client.get("/subreddits/1/posts").status_code == HTTPStatus.OK
+
+        test_client.delete("/posts/1", headers=set_authorization_token(login_test_user))
+
+        all_posts = test_client.get("/posts")
+        subreddit_posts = test_client.get("/subreddits/1/posts")
+
+    assert all_posts.status_code == HTTPStatus.NOT_FOUND
+    assert subreddit_posts.status_code == HTTPStatus.NOT_FOUND
+
+
 def test_delete_a_non_existent_post(
     client_app: FlaskClient, login_test_user: str
 ) -> None:
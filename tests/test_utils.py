@@ -0,0 +1,264 @@
+import json
+from http import HTTPStatus
+from logging import getLogger
+from queue import Queue
+
+from flask import Flask
+from flask.testing import FlaskClient
+from pytest import LogCaptureFixture, MonkeyPatch
+
+from ..configs import configs
+from ..tafakari.extensions import cache, local_cache, redis_client
+from ..tafakari.instrumentation import _start_request, suspected_n_plus_one
+from ..tafakari.localcache import LocalCache
+from ..tafakari.responses import cacheable_response, cached_response
+from ..tafakari.utils import (
+    CACHE_LOCK,
+    AccessLogFormatter,
+    BoundedQueueHandler,
+    cache_getter,
+    cache_invalidator,
+    cache_key_family,
+    cache_setter,
+    decode_cache_value,
+    encode_cache_value,
+    get_or_recompute,
+)
+from ..tafakari.votes import record_vote
+from .test_subreddits import set_authorization_token
+
+
+def test_get_or_recompute_builds_once(client_app: FlaskClient) -> None:
+    builds = []
+
+    def builder() -> dict:
+        builds.append(1)
+        return {"built": len(builds)}
+
+    assert get_or_recompute("test_key", builder) == {"built": 1}
+    assert get_or_recompute("test_key", builder) == {"built": 1}
+    assert len(builds) == 1
+
+
+def test_get_or_recompute_serves_stale_while_locked(client_app: FlaskClient) -> None:
+    get_or_recompute("test_key", lambda: {"version": 1}, timeout=0)
+    redis_client.set(CACHE_LOCK("test_key"), "another worker")
+
+    # The entry is past its expiry, but another worker holds the rebuild lock
+    assert get_or_recompute("test_key", lambda: {"version": 2}) == {"version": 1}
+
+    redis_client.delete(CACHE_LOCK("test_key"))
+
+    assert get_or_recompute("test_key", lambda: {"version": 2}) == {"version": 2}
+    assert decode_cache_value(cache.get("test_key"))["value"] == {"version": 2}
+
+
+def test_local_cache_lru_and_ttl() -> None:
+    local = LocalCache(maxsize=2, timeout=60)
+    local.set("first", 1)
+    local.set("second", 2)
+
+    assert local.get("first") == 1
+
+    # "second" is now the least recently used entry
+    local.set("third", 3)
+
+    assert local.get("second") is None
+    assert local.get("third") == 3
+
+    local.set("expired", 4, timeout=-1)
+
+    assert local.get("expired") is None
+    assert local.stats()["evictions"] == 2
+    assert local.stats()["hit_ratio"] == 0.5
+
+
+def test_cache_invalidator_drops_local_copies(client_app: FlaskClient) -> None:
+    cache_setter("test_key", {"version": 1})
+    cache.delete("test_key")
+
+    # Served from the worker's copy without touching Redis
+    assert cache_getter("test_key") == {"version": 1}
+
+    cache_invalidator("test_key")
+
+    assert cache_getter("test_key") is None
+
+
+def test_cached_response_serves_stored_bytes(client_app: FlaskClient) -> None:
+    entry = cacheable_response({"posts": [{"id": 1, "votes": 3}]})
+
+    response, status = cached_response(entry)
+
+    assert status == HTTPStatus.OK
+    assert response.get_data() == entry["body"]
+    assert entry["vote_refs"] == {"post": [1]}
+
+    # Unflushed votes are overlaid on a decoded copy of the body
+    record_vote("post", 1, upvotes=2)
+    response, status = cached_response(entry)
+
+    assert response.json["posts"][0]["votes"] == 5
+
+
+def test_cache_values_compressed_above_threshold() -> None:
+    small, _ = encode_cache_value({"posts": []})
+    large, raw_size = encode_cache_value({"posts": ["Turner"] * 2000})
+
+    assert decode_cache_value(small) == {"posts": []}
+    assert decode_cache_value(large) == {"posts": ["Turner"] * 2000}
+    assert len(large) < raw_size
+
+    # Values cached before the header existed are served as they are
+    assert decode_cache_value({"legacy": True}) == {"legacy": True}
+
+
+def test_cache_key_family() -> None:
+    assert cache_key_family("all_posts_25_head@3") == "ALL_POSTS"
+    assert cache_key_family("all_posts_in_subreddit_1_hot_25@0") == (
+        "ALL_POSTS_IN_SUBREDDIT"
+    )
+    assert cache_key_family("subreddit_members_1") == "SUBREDDIT_MEMBERS"
+    assert cache_key_family("tester_profile") == "PROFILE"
+    assert cache_key_family("test_key") == "OTHER"
+
+
+def test_warm_cache_command(
+    app: Flask, client_app: FlaskClient, create_mock_post: dict, assert_num_queries
+) -> None:
+    cache.clear()
+    local_cache.clear()
+
+    result = app.test_cli_runner().invoke(args=["warm-cache", "--concurrency", "2"])
+
+    # The listings, the subreddit, its four feeds and the post
+    assert result.exit_code == 0
+    assert "Warmed 8 keys" in result.output
+
+    with client_app as test_client, assert_num_queries(0):
+        assert test_client.get("/subreddits").status_code == HTTPStatus.OK
+        assert test_client.get("/subreddits/1/posts?sort=top").status_code == (
+            HTTPStatus.OK
+        )
+        assert test_client.get("/posts/1").status_code == HTTPStatus.OK
+
+
+def test_get_cache_metrics(
+    client_app: FlaskClient, login_test_user: str, create_mock_post: dict
+) -> None:
+    admin = dict(username="admin", email="admin@email.com", password="password")
+
+    with client_app as test_client:
+        test_client.post("/auth/register", json=dict(admin, is_admin=True))
+        admin_token = test_client.post("/auth/login", json=admin).json["access_token"]
+
+        test_client.get("/posts/1")
+        local_cache.clear()
+        test_client.get("/posts/1")
+        test_client.get("/posts/2")
+
+        forbidden = test_client.get(
+            "/metrics/cache", headers=set_authorization_token(login_test_user)
+        )
+        response = test_client.get(
+            "/metrics/cache", headers=set_authorization_token(admin_token)
+        )
+
+    post_stats = response.json["families"]["POST_ID"]
+
+    assert forbidden.status_code == HTTPStatus.FORBIDDEN
+    assert response.status_code == HTTPStatus.OK
+    assert post_stats["local_hits"] == 1
+    assert post_stats["hits"] == 1
+    assert post_stats["misses"] == 1
+    assert post_stats["writes"] == 1
+    assert post_stats["avg_stored_bytes"] > 0
+
+
+def test_request_metrics_export(
+    client_app: FlaskClient, create_mock_post: dict, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr(configs, "METRICS_TOKEN", "scrape-token")
+
+    with client_app as test_client:
+        test_client.get("/posts")
+        test_client.get("/posts")
+        forbidden = test_client.get("/metrics")
+        response = test_client.get(
+            "/metrics", headers={"Authorization": "Bearer scrape-token"}
+        )
+
+    assert forbidden.status_code == HTTPStatus.FORBIDDEN
+
+    labels = 'blueprint="post",route="/posts",method="GET"'
+    exposition = response.get_data(as_text=True)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.mimetype == "text/plain"
+    assert f'http_requests_total{{{labels},status="200"}} 2' in exposition
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in exposition
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in exposition
+    assert "# TYPE http_requests_in_flight gauge" in exposition
+
+
+def test_server_timing_header(client_app: FlaskClient, create_mock_post: dict) -> None:
+    with client_app as test_client:
+        response = test_client.get("/posts/1?comment_sort=new")
+
+    server_timing = response.headers["Server-Timing"]
+
+    assert server_timing.startswith("db;dur=")
+    assert 'redis;desc="' in server_timing
+    assert "total;dur=" in server_timing
+
+
+def test_suspected_n_plus_one() -> None:
+    by_id = "SELECT * FROM post WHERE post.id = %(id)s"
+    statements = {
+        by_id: [repr({"id": post_id}) for post_id in range(5)],
+        "SELECT 1": ["{}"] * 5,
+        "SELECT * FROM subreddit": ["{}"],
+    }
+
+    assert suspected_n_plus_one(statements) == [by_id]
+
+
+def test_bounded_queue_handler_drops_when_full() -> None:
+    handler = BoundedQueueHandler(Queue(maxsize=1), policy="drop")
+    logger = getLogger("test_bounded_queue")
+    logger.propagate = False
+    logger.addHandler(handler)
+
+    # Nothing drains the queue, so it is full after the first record
+    logger.warning("first")
+    logger.warning("second")
+    logger.removeHandler(handler)
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_access_log_record(
+    client_app: FlaskClient,
+    create_mock_post: dict,
+    caplog: LogCaptureFixture,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(configs, "ACCESS_LOG_SAMPLE_RATE", 1.0)
+
+    with caplog.at_level("INFO", logger="default"), client_app as test_client:
+        test_client.get("/posts/1")
+
+    record = [record for record in caplog.records if hasattr(record, "access")][-1]
+    line = json.loads(AccessLogFormatter().format(record))
+
+    assert line["route"] == "/posts/<int:post_id>"
+    assert line["status"] == HTTPStatus.OK
+    # The post was cached when it was created
+    assert line["cache_hit"] is True
+    assert {"time", "duration_ms", "db_ms", "ip"} <= line.keys()
+
+
+def test_request_clock_starts_before_other_hooks(client_app: FlaskClient) -> None:
+    # Responses from hooks such as the limiter's must still be logged and counted
+    assert client_app.application.before_request_funcs[None][0] is _start_request